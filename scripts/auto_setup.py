@@ -7,28 +7,38 @@
 
 import sys
 import os
+import shutil
 import subprocess
 from pathlib import Path
 
-# UTF-8 인코딩 강제 설정
+# UTF-8 인코딩 강제 설정 (래퍼 재생성 없이 reconfigure)
 if sys.platform == "win32":
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+
+# 경로 상수 (함수마다 Path(__file__) 재계산 방지)
+_HERE = Path(__file__).resolve().parent
+_ROOT = _HERE.parent
+_REQ = _ROOT / "requirements.txt"
+_DL = _HERE / "download_models.py"
+
+# 같은 디렉토리의 diagnose 모듈을 직접 import (서브프로세스 기동 비용 제거)
+sys.path.insert(0, str(_HERE))
+import diagnose
 
 def run_diagnosis():
-    """진단 스크립트 실행"""
+    """진단 실행 (diagnose 모듈 직접 호출, 진단 결과 dict 반환)"""
     print("=" * 60)
     print("STEP 1: Environment Diagnosis")
     print("=" * 60)
-    
-    diagnose_script = Path(__file__).parent / "diagnose.py"
-    if not diagnose_script.exists():
-        print(f"ERROR: diagnose.py not found at {diagnose_script}", file=sys.stderr)
-        return False
-    
-    result = subprocess.run([sys.executable, str(diagnose_script)], capture_output=False)
-    return result.returncode == 0
+
+    try:
+        data = diagnose.run_diagnosis()
+        diagnose.print_diagnosis(data)
+        return data
+    except Exception as e:
+        print(f"ERROR: Diagnosis failed: {e}", file=sys.stderr)
+        return None
 
 def install_requirements():
     """requirements.txt 설치"""
@@ -36,16 +46,26 @@ def install_requirements():
     print("STEP 2: Installing Requirements")
     print("=" * 60)
     
-    requirements_file = Path(__file__).parent.parent / "requirements.txt"
-    if not requirements_file.exists():
-        print(f"ERROR: requirements.txt not found at {requirements_file}", file=sys.stderr)
+    if not _REQ.exists():
+        print(f"ERROR: requirements.txt not found at {_REQ}", file=sys.stderr)
         return False
-    
-    print(f"Installing from {requirements_file}...")
-    result = subprocess.run(
-        [sys.executable, "-m", "pip", "install", "-r", str(requirements_file)],
-        capture_output=False
-    )
+
+    # 휠 캐시 재사용 + 바이너리 휠 우선 (재실행 시 소스 빌드/네트워크 왕복 최소화)
+    env = {
+        **os.environ,
+        "PIP_CACHE_DIR": str(_ROOT / ".pip-cache"),
+        "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+    }
+
+    # uv가 설치되어 있으면 훨씬 빠른 resolver 사용
+    uv = shutil.which("uv")
+    if uv:
+        cmd = [uv, "pip", "install", "--python", sys.executable, "-r", str(_REQ)]
+    else:
+        cmd = [sys.executable, "-m", "pip", "install", "--prefer-binary", "-r", str(_REQ)]
+
+    print(f"Installing from {_REQ}...")
+    result = subprocess.run(cmd, capture_output=False, env=env)
     
     if result.returncode == 0:
         print("✓ Requirements installed successfully")
@@ -60,12 +80,11 @@ def download_models():
     print("STEP 3: Downloading Models")
     print("=" * 60)
     
-    download_script = Path(__file__).parent / "download_models.py"
-    if not download_script.exists():
-        print(f"ERROR: download_models.py not found at {download_script}", file=sys.stderr)
+    if not _DL.exists():
+        print(f"ERROR: download_models.py not found at {_DL}", file=sys.stderr)
         return False
-    
-    result = subprocess.run([sys.executable, str(download_script)], capture_output=False)
+
+    result = subprocess.run([sys.executable, str(_DL)], capture_output=False)
     
     if result.returncode == 0:
         print("✓ Models downloaded successfully")
@@ -80,19 +99,23 @@ def verify_setup():
     print("STEP 4: Verifying Setup")
     print("=" * 60)
     
-    diagnose_script = Path(__file__).parent / "diagnose.py"
-    result = subprocess.run(
-        [sys.executable, str(diagnose_script), "--json"],
-        capture_output=True,
-        text=True
-    )
-    
-    if result.returncode == 0:
+    # 검증 단계는 결과만 필요하므로 전체 리포트를 다시 출력하지 않음
+    try:
+        data = diagnose.run_diagnosis()
+        is_ready = all(
+            info.get("status") == "ok"
+            for section in ("libraries", "models", "scripts")
+            for info in data[section].values()
+        )
+    except Exception as e:
+        print(f"✗ Setup verification failed: {e}", file=sys.stderr)
+        return False
+
+    if is_ready:
         print("✓ Setup verification passed")
         return True
     else:
         print("✗ Setup verification failed", file=sys.stderr)
-        print(result.stderr, file=sys.stderr)
         return False
 
 def main():
@@ -111,20 +134,36 @@ def main():
     
     try:
         # 1. 진단
-        if not run_diagnosis():
+        data = run_diagnosis()
+        if data is None:
             print("\n⚠ Diagnosis found issues, but continuing...")
-        
-        # 2. 라이브러리 설치
-        if not install_requirements():
+
+        # 이미 모든 준비가 끝났으면 설치/다운로드 전체 생략
+        if data is not None and diagnose.is_ready(data):
+            print("\n" + "=" * 60)
+            print("✓ SETUP COMPLETE! (environment already ready)")
+            print("=" * 60)
+            print("You can now use the mosaic super-resolution feature.")
+            sys.exit(0)
+
+        libs_ok = data is not None and diagnose._ok(data["libraries"])
+        models_ok = data is not None and diagnose._ok(data["models"])
+
+        # 2. 라이브러리 설치 (이미 설치돼 있으면 생략)
+        if libs_ok:
+            print("\n✓ Required libraries already installed - skipping install step")
+        elif not install_requirements():
             print("\n✗ Failed to install requirements. Please install manually:", file=sys.stderr)
             print("  pip install -r requirements.txt", file=sys.stderr)
             sys.exit(1)
-        
-        # 3. 모델 다운로드
-        if not download_models():
+
+        # 3. 모델 다운로드 (이미 있으면 생략)
+        if models_ok:
+            print("\n✓ Model files already present - skipping download step")
+        elif not download_models():
             print("\n⚠ Failed to download models. You can download manually:", file=sys.stderr)
             print("  python scripts/download_models.py", file=sys.stderr)
-        
+
         # 4. 검증
         if verify_setup():
             print("\n" + "=" * 60)
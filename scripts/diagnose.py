@@ -9,13 +9,35 @@ import sys
 import os
 import subprocess
 import json
+import functools
+import importlib.metadata
+import importlib.util
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# UTF-8 인코딩 강제 설정 (Windows 환경 대응)
+# C 확장 import 중 내부 스레드 풀 난립 방지 (torch/cv2 초기화 비용 절감)
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+# UTF-8 인코딩 강제 설정 (Windows 환경 대응, 래퍼 재생성 없이 reconfigure)
 if sys.platform == "win32":
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+
+@functools.lru_cache(maxsize=256)
+def _cached_stat(path_str):
+    """stat 결과 캐시 (같은 경로의 중복 stat 시스템콜 방지)"""
+    try:
+        return os.stat(path_str)
+    except OSError:
+        return None
+
+
+def _path_exists(path):
+    """캐시된 stat 기반 존재 여부 확인"""
+    return _cached_stat(str(path)) is not None
+
 
 def check_python_version():
     """Python 버전 확인"""
@@ -26,15 +48,43 @@ def check_python_version():
         "message": "Python 3.8+ required" if version.major < 3 or version.minor < 8 else "OK"
     }
 
+# import 이름 → 배포판 이름 매핑 (metadata 조회용)
+_DIST_ALIASES = {
+    "cv2": ("opencv-python", "opencv-contrib-python", "opencv-python-headless"),
+    "PIL": ("pillow",),
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _installed_distributions():
+    """설치된 배포판 이름 집합 (한 번의 메타데이터 순회로 모든 조회 처리)"""
+    names = set()
+    try:
+        for dist in importlib.metadata.distributions():
+            name = dist.metadata["Name"]
+            if name:
+                names.add(name.lower())
+    except Exception:
+        pass
+    return frozenset(names)
+
+
 def check_library(lib_name, import_name=None):
-    """라이브러리 설치 여부 확인"""
+    """라이브러리 설치 여부 확인 (모듈 실행 없이 메타데이터/스펙만 조회)"""
     if import_name is None:
         import_name = lib_name
-    
+
+    # 1차: 배포판 메타데이터 집합에서 O(1) 조회
+    installed_dists = _installed_distributions()
+    for dist_name in _DIST_ALIASES.get(import_name, (import_name,)):
+        if dist_name.lower() in installed_dists:
+            return {"status": "ok", "installed": True}
+
+    # 2차: 메타데이터 없이 설치된 경우 대비 find_spec 폴백
+    # (find_spec은 모듈 코드를 실행하지 않으므로 torch 초기화를 건너뜀)
     try:
-        __import__(import_name)
-        return {"status": "ok", "installed": True}
-    except ImportError as e:
+        spec = importlib.util.find_spec(import_name)
+    except (ValueError, ModuleNotFoundError) as e:
         return {
             "status": "error",
             "installed": False,
@@ -42,10 +92,20 @@ def check_library(lib_name, import_name=None):
             "install_command": f"pip install {lib_name}"
         }
 
+    if spec is not None:
+        return {"status": "ok", "installed": True}
+
+    return {
+        "status": "error",
+        "installed": False,
+        "error": f"No module named '{import_name}'",
+        "install_command": f"pip install {lib_name}"
+    }
+
 def check_model_file(model_name, weights_dir="weights"):
     """모델 파일 존재 여부 확인"""
     model_path = Path(weights_dir) / f"{model_name}.pth"
-    exists = model_path.exists()
+    exists = _path_exists(model_path)
     
     return {
         "status": "ok" if exists else "error",
@@ -54,8 +114,36 @@ def check_model_file(model_name, weights_dir="weights"):
         "download_url": f"https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/{model_name}.pth" if not exists else None
     }
 
-def check_gpu():
-    """GPU 사용 가능 여부 확인"""
+# GPU 프로브 캐시 (torch import + CUDA 초기화는 수백 ms라 60초간 재사용)
+_GPU_CACHE_TTL = 60
+
+
+def _gpu_cache_path():
+    return Path(tempfile.gettempdir()) / "seexcool_gpu.json"
+
+
+def _load_gpu_cache():
+    """최근 GPU 프로브 결과 로드 (없거나 오래됐으면 None)"""
+    try:
+        with open(_gpu_cache_path(), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if time.time() - cached.get("ts", 0) < _GPU_CACHE_TTL and "result" in cached:
+            return cached["result"]
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _save_gpu_cache(result):
+    try:
+        with open(_gpu_cache_path(), "w", encoding="utf-8") as f:
+            json.dump({"ts": time.time(), "result": result}, f)
+    except OSError:
+        pass
+
+
+def _probe_gpu():
+    """torch를 실제로 import해 GPU 상태 확인"""
     try:
         import torch
         cuda_available = torch.cuda.is_available()
@@ -81,6 +169,17 @@ def check_gpu():
             "message": "torch not installed"
         }
 
+
+def check_gpu():
+    """GPU 사용 가능 여부 확인 (최근 결과는 캐시 재사용)"""
+    cached = _load_gpu_cache()
+    if cached is not None:
+        return cached
+
+    result = _probe_gpu()
+    _save_gpu_cache(result)
+    return result
+
 def check_script_files():
     """필수 스크립트 파일 존재 여부 확인"""
     scripts = {
@@ -92,7 +191,7 @@ def check_script_files():
     results = {}
     for script, description in scripts.items():
         script_path = Path("scripts") / script
-        exists = script_path.exists()
+        exists = _path_exists(script_path)
         results[script] = {
             "status": "ok" if exists else "error",
             "exists": exists,
@@ -112,8 +211,8 @@ def check_paths():
     
     results = {}
     for name, path in paths.items():
-        exists = path.exists()
-        writable = os.access(path.parent if not exists else path, os.W_OK) if path.parent.exists() else False
+        exists = _path_exists(path)
+        writable = os.access(path.parent if not exists else path, os.W_OK) if _path_exists(path.parent) else False
         
         results[name] = {
             "status": "ok" if exists else "warning",
@@ -127,6 +226,10 @@ def check_paths():
 
 def run_diagnosis():
     """전체 진단 실행"""
+    # 진단 1회 범위에서만 stat/메타데이터 캐시 유지 (이전 실행의 상태 무효화)
+    _cached_stat.cache_clear()
+    _installed_distributions.cache_clear()
+
     diagnosis = {
         "python": check_python_version(),
         "libraries": {},
@@ -146,8 +249,11 @@ def run_diagnosis():
         ("realesrgan", "realesrgan"),
     ]
     
-    for lib_name, import_name in required_libs:
-        diagnosis["libraries"][lib_name] = check_library(lib_name, import_name)
+    # import 프로브 병렬 실행 (C 확장 로딩 중 GIL이 풀려 겹쳐서 진행됨)
+    with ThreadPoolExecutor(max_workers=len(required_libs)) as executor:
+        probe_results = executor.map(lambda pair: (pair[0], check_library(*pair)), required_libs)
+        for lib_name, result in probe_results:
+            diagnosis["libraries"][lib_name] = result
     
     # 필수 모델 파일 확인
     required_models = [
@@ -159,95 +265,100 @@ def run_diagnosis():
     
     return diagnosis
 
+def _ok(section):
+    """섹션 내 모든 항목이 ok 상태인지 확인"""
+    return all(v.get("status") == "ok" for v in section.values())
+
+
+def is_ready(diagnosis):
+    """전체 준비 상태 판정 (출력과 분리된 평가)"""
+    return _ok(diagnosis["libraries"]) and _ok(diagnosis["models"]) and _ok(diagnosis["scripts"])
+
+
 def print_diagnosis(diagnosis):
-    """진단 결과 출력"""
-    print("=" * 60)
-    print("ENVIRONMENT DIAGNOSIS REPORT")
-    print("=" * 60)
-    
+    """진단 결과 출력 (리포트를 버퍼에 모아 한 번에 기록)"""
+    out = []
+    out.append("=" * 60)
+    out.append("ENVIRONMENT DIAGNOSIS REPORT")
+    out.append("=" * 60)
+
     # Python 버전
     py_info = diagnosis["python"]
     status_icon = "✓" if py_info["status"] == "ok" else "✗"
-    print(f"\n{status_icon} Python Version: {py_info['version']}")
+    out.append(f"\n{status_icon} Python Version: {py_info['version']}")
     if py_info["status"] != "ok":
-        print(f"  ⚠ {py_info['message']}")
-    
+        out.append(f"  ⚠ {py_info['message']}")
+
     # 라이브러리
-    print("\n📦 Required Libraries:")
-    all_libs_ok = True
+    out.append("\n📦 Required Libraries:")
     for lib_name, lib_info in diagnosis["libraries"].items():
         status_icon = "✓" if lib_info["status"] == "ok" else "✗"
-        print(f"  {status_icon} {lib_name}: ", end="")
         if lib_info["installed"]:
-            print("Installed")
+            out.append(f"  {status_icon} {lib_name}: Installed")
         else:
-            print(f"NOT INSTALLED")
-            print(f"    → Run: {lib_info.get('install_command', 'pip install ' + lib_name)}")
-            all_libs_ok = False
-    
+            out.append(f"  {status_icon} {lib_name}: NOT INSTALLED")
+            out.append(f"    → Run: {lib_info.get('install_command', 'pip install ' + lib_name)}")
+
     # 모델 파일
-    print("\n🤖 Model Files:")
-    all_models_ok = True
+    out.append("\n🤖 Model Files:")
     for model_name, model_info in diagnosis["models"].items():
         status_icon = "✓" if model_info["status"] == "ok" else "✗"
-        print(f"  {status_icon} {model_name}: ", end="")
         if model_info["exists"]:
-            print(f"Found at {model_info['path']}")
+            out.append(f"  {status_icon} {model_name}: Found at {model_info['path']}")
         else:
-            print(f"NOT FOUND")
+            out.append(f"  {status_icon} {model_name}: NOT FOUND")
             if model_info.get("download_url"):
-                print(f"    → Download: {model_info['download_url']}")
-            all_models_ok = False
-    
+                out.append(f"    → Download: {model_info['download_url']}")
+
     # GPU
     gpu_info = diagnosis["gpu"]
-    status_icon = "✓" if gpu_info["status"] == "ok" else "✗"
-    print(f"\n🎮 GPU Status: ", end="")
     if gpu_info.get("available"):
-        print(f"Available ({gpu_info.get('device_name', 'Unknown')})")
+        out.append(f"\n🎮 GPU Status: Available ({gpu_info.get('device_name', 'Unknown')})")
     else:
-        print(f"Not Available - CPU mode will be used")
-    
+        out.append("\n🎮 GPU Status: Not Available - CPU mode will be used")
+
     # 스크립트 파일
-    print("\n📜 Script Files:")
-    all_scripts_ok = True
+    out.append("\n📜 Script Files:")
     for script_name, script_info in diagnosis["scripts"].items():
         status_icon = "✓" if script_info["status"] == "ok" else "✗"
-        print(f"  {status_icon} {script_name}: ", end="")
         if script_info["exists"]:
-            print("Found")
+            out.append(f"  {status_icon} {script_name}: Found")
         else:
-            print("NOT FOUND")
-            all_scripts_ok = False
-    
+            out.append(f"  {status_icon} {script_name}: NOT FOUND")
+
     # 경로
-    print("\n📁 Paths:")
+    out.append("\n📁 Paths:")
     for path_name, path_info in diagnosis["paths"].items():
         status_icon = "✓" if path_info["status"] == "ok" else "⚠"
-        print(f"  {status_icon} {path_name}: {path_info['path']}")
+        out.append(f"  {status_icon} {path_name}: {path_info['path']}")
         if not path_info["exists"]:
-            print(f"    → Will be created automatically")
-    
+            out.append("    → Will be created automatically")
+
     # 전체 상태
-    print("\n" + "=" * 60)
-    overall_status = "READY" if all_libs_ok and all_models_ok and all_scripts_ok else "ISSUES FOUND"
-    status_color = "GREEN" if overall_status == "READY" else "YELLOW"
-    print(f"Overall Status: {overall_status}")
-    print("=" * 60)
-    
-    return overall_status == "READY"
+    ready = is_ready(diagnosis)
+    out.append("\n" + "=" * 60)
+    out.append(f"Overall Status: {'READY' if ready else 'ISSUES FOUND'}")
+    out.append("=" * 60)
+
+    # stdio 락/인코딩 비용을 줄이기 위해 한 번만 기록
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
+
+    return ready
 
 def main():
     """메인 함수"""
     try:
         diagnosis = run_diagnosis()
-        is_ready = print_diagnosis(diagnosis)
-        
-        # JSON 출력 (API용)
+        ready = is_ready(diagnosis)
+
+        # JSON 모드에서는 사람용 리포트 생성을 통째로 생략 (API용)
         if "--json" in sys.argv:
-            print("\n" + json.dumps(diagnosis, indent=2, ensure_ascii=False))
-        
-        sys.exit(0 if is_ready else 1)
+            print(json.dumps(diagnosis, indent=2, ensure_ascii=False))
+        else:
+            print_diagnosis(diagnosis)
+
+        sys.exit(0 if ready else 1)
     except Exception as e:
         print(f"ERROR: Diagnosis failed: {e}", file=sys.stderr)
         import traceback
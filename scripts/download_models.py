@@ -7,47 +7,274 @@
 
 import sys
 import os
+import time
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import hashlib
 
-# UTF-8 인코딩 강제 설정
+# requests는 선택적 (keep-alive 연결 풀 재사용, 없으면 urllib 폴백)
+HAS_REQUESTS = False
+SESSION = None
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    SESSION = requests.Session()
+    _adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+    SESSION.mount("https://", _adapter)
+    SESSION.mount("http://", _adapter)
+    HAS_REQUESTS = True
+except ImportError:
+    pass
+
+# UTF-8 인코딩 강제 설정 (reconfigure는 래퍼 재생성 없이 인코딩만 교체)
 if sys.platform == "win32":
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
 
 # 모델 정보 (이름, URL, 파일 크기)
 MODELS = {
     "RealESRGAN_x4plus": {
         "url": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/RealESRGAN_x4plus.pth",
         "size_mb": 67,
+        "sha256": "4fa0d38905f75ac06eb49a7951b426670021be3018265fd191d2125df9d682f1",
         "description": "Real-ESRGAN x4plus model for general image super-resolution"
     }
 }
 
-def download_file(url: str, dest_path: Path, description: str = ""):
-    """파일 다운로드 (진행률 표시)"""
+# 파일당 병렬 Range 연결 수 (CDN 연결별 속도 제한 우회)
+RANGE_CONNECTIONS = 8
+
+# 다운로드 기록 청크 크기 (큰 청크로 write 시스템콜 수 축소)
+WRITE_CHUNK = 4 * 1024 * 1024
+
+
+def _drop_page_cache(fd: int):
+    """기록한 페이지를 페이지 캐시에서 해제 (모델 파일은 한 번만 읽히므로)"""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+
+def _get_content_length(url: str):
+    """HEAD 요청으로 파일 크기 확인 (Range 지원 여부 판단용)"""
+    try:
+        if HAS_REQUESTS:
+            response = SESSION.head(url, timeout=30, allow_redirects=True)
+            length = response.headers.get("Content-Length")
+            accept_ranges = response.headers.get("Accept-Ranges", "")
+        else:
+            request = urllib.request.Request(url, method="HEAD")
+            with urllib.request.urlopen(request, timeout=30) as response:
+                length = response.headers.get("Content-Length")
+                accept_ranges = response.headers.get("Accept-Ranges", "")
+        if length and accept_ranges.lower() == "bytes":
+            return int(length)
+    except (urllib.error.URLError, OSError, ValueError):
+        pass
+    return None
+
+
+def _download_range(url: str, fd: int, start: int, end: int):
+    """단일 Range 구간 다운로드 (os.pwrite로 지정 오프셋에 기록)"""
+    headers = {"Range": f"bytes={start}-{end}"}
+    if HAS_REQUESTS:
+        # 연결 풀 재사용으로 TLS 핸드셰이크/slow-start 비용 절감
+        with SESSION.get(url, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code != 206:
+                raise urllib.error.URLError("Server does not support Range requests")
+            offset = start
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                os.pwrite(fd, chunk, offset)
+                offset += len(chunk)
+    else:
+        request = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(request, timeout=60) as response:
+            # 서버가 Range를 무시하고 200을 반환하면 분할 다운로드 불가
+            if response.status != 206:
+                raise urllib.error.URLError("Server does not support Range requests")
+            offset = start
+            while True:
+                chunk = response.read(1024 * 1024)
+                if not chunk:
+                    break
+                os.pwrite(fd, chunk, offset)
+                offset += len(chunk)
+    return end - start + 1
+
+
+def _hash_file(path: Path):
+    """파일 전체 SHA-256 계산 (병렬 Range 다운로드 후 검증용)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(4 * 1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _download_stream(url: str, dest_path: Path, resume_from: int = 0):
+    """단일 스트림 다운로드 (1 MB 청크, 진행률은 250 ms 간격으로만 갱신)
+
+    다운로드 중에 SHA-256을 같이 계산해 별도 검증 패스를 생략한다.
+    resume_from > 0이면 Range 헤더로 이어받기를 시도한다 (지원하지 않는
+    서버가 200을 반환하면 처음부터 다시 받음). 이어받기 시에는 앞부분
+    해시를 알 수 없으므로 None을 반환한다.
+    """
+    headers = {}
+    if resume_from > 0:
+        headers["Range"] = f"bytes={resume_from}-"
+
+    h = hashlib.sha256()
+    with SESSION.get(url, headers=headers, stream=True, timeout=30) as response:
+        response.raise_for_status()
+
+        resumed = resume_from > 0 and response.status_code == 206
+        if resume_from > 0 and not resumed:
+            print("⚠ Server does not support resume, restarting from 0", file=sys.stderr)
+
+        total_size = int(response.headers.get("Content-Length", 0))
+        downloaded = 0
+        if resumed:
+            total_size += resume_from
+            downloaded = resume_from
+            print(f"Resuming download from {resume_from / (1024 * 1024):.1f} MB...")
+
+        last_report = 0.0
+        open_flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if resumed else os.O_TRUNC)
+        fd = os.open(dest_path, open_flags, 0o644)
+        try:
+            for chunk in response.iter_content(chunk_size=WRITE_CHUNK):
+                os.write(fd, chunk)
+                h.update(chunk)
+                downloaded += len(chunk)
+                now = time.monotonic()
+                if total_size > 0 and (now - last_report > 0.25 or downloaded >= total_size):
+                    last_report = now
+                    percent = min(100, int(downloaded * 100 / total_size))
+                    print(f"\rProgress: {percent}% ({downloaded / (1024 * 1024):.1f}/{total_size / (1024 * 1024):.1f} MB)", end="", flush=True)
+            _drop_page_cache(fd)
+        finally:
+            os.close(fd)
+    return None if resumed else h.hexdigest()
+
+
+def _download_ranged(url: str, dest_path: Path, total_size: int):
+    """병렬 Range GET으로 파일 다운로드 (aria2 스타일 분할 다운로드)"""
+    part_size = total_size // RANGE_CONNECTIONS
+    ranges = []
+    for i in range(RANGE_CONNECTIONS):
+        start = i * part_size
+        end = total_size - 1 if i == RANGE_CONNECTIONS - 1 else start + part_size - 1
+        ranges.append((start, end))
+
+    fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # 파일 공간 미리 할당 (가능한 플랫폼에서만)
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, total_size)
+        else:
+            os.ftruncate(fd, total_size)
+
+        downloaded = 0
+        with ThreadPoolExecutor(max_workers=RANGE_CONNECTIONS) as executor:
+            futures = [
+                executor.submit(_download_range, url, fd, start, end)
+                for start, end in ranges
+            ]
+            for future in as_completed(futures):
+                downloaded += future.result()
+                percent = min(100, int(downloaded * 100 / total_size))
+                print(f"\rProgress: {percent}% ({downloaded / (1024 * 1024):.1f}/{total_size / (1024 * 1024):.1f} MB)", end="", flush=True)
+        _drop_page_cache(fd)
+    finally:
+        os.close(fd)
+
+
+def _check_digest(dest_path: Path, digest, expected_sha256):
+    """다운로드 결과의 SHA-256 검증"""
+    if not expected_sha256:
+        return True
+    if digest is None:
+        digest = _hash_file(dest_path)
+    if digest == expected_sha256:
+        print(f"✓ SHA-256 verified: {digest[:16]}...")
+        return True
+    print(f"✗ SHA-256 mismatch: expected {expected_sha256}, got {digest}", file=sys.stderr)
+    return False
+
+
+def _finalize_download(part_path: Path, dest_path: Path, digest, expected_sha256):
+    """검증을 통과한 경우에만 .part 파일을 최종 경로로 원자적 교체
+
+    최종 경로에 직접 쓰면 (특히 ranged 경로는 전체 크기를 미리 할당하므로)
+    도중에 죽은 다운로드가 전체 크기의 쓰레기 파일을 남기고, 크기만 보는
+    verify_file의 exists 단축 경로가 다음 실행에서 이를 유효한 모델로
+    영구 오인한다.
+    """
+    if not _check_digest(part_path, digest, expected_sha256):
+        return False
+    os.replace(part_path, dest_path)
+    return True
+
+
+def download_file(url: str, dest_path: Path, description: str = "", expected_sha256: str = None):
+    """파일 다운로드 (진행률 표시, SHA-256 검증)"""
     try:
         print(f"Downloading {description or dest_path.name}...")
         print(f"URL: {url}")
         print(f"Destination: {dest_path}")
-        
+
+        # urlretrieve는 8 KB 블록마다 훅을 호출하므로 출력은 최대 10 Hz로 제한
+        last_report = [0.0]
+
         def progress_hook(count, block_size, total_size):
             if total_size > 0:
                 percent = min(100, int(count * block_size * 100 / total_size))
+                now = time.monotonic()
+                if percent < 100 and now - last_report[0] < 0.1:
+                    return
+                last_report[0] = now
                 size_mb = total_size / (1024 * 1024)
                 downloaded_mb = count * block_size / (1024 * 1024)
                 print(f"\rProgress: {percent}% ({downloaded_mb:.1f}/{size_mb:.1f} MB)", end="", flush=True)
-        
+
         # 디렉토리 생성
         dest_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # 다운로드
-        urllib.request.urlretrieve(url, dest_path, reporthook=progress_hook)
+
+        # 병렬 Range 다운로드 시도 (서버가 지원하지 않으면 단일 스트림 폴백)
+        total_size = _get_content_length(url)
+
+        # 모든 경로가 .part에 기록하고 검증 후에만 최종 경로로 교체한다
+        part_path = dest_path.with_suffix(dest_path.suffix + ".part")
+
+        # 중단된 다운로드가 있으면 남은 구간만 이어받기
+        partial_size = part_path.stat().st_size if part_path.exists() else 0
+        if HAS_REQUESTS and total_size and 0 < partial_size < total_size:
+            digest = _download_stream(url, part_path, resume_from=partial_size)
+            print("\n✓ Download complete!")
+            return _finalize_download(part_path, dest_path, digest, expected_sha256)
+
+        if total_size:
+            try:
+                _download_ranged(url, part_path, total_size)
+                print("\n✓ Download complete!")
+                # 병렬 기록은 순서가 섞이므로 완료 후 한 번에 해시
+                return _finalize_download(part_path, dest_path, None, expected_sha256)
+            except (urllib.error.URLError, OSError) as e:
+                print(f"\n⚠ Ranged download failed ({e}), falling back to single stream...", file=sys.stderr)
+
+        # 단일 스트림 다운로드 (requests가 있으면 keep-alive 스트리밍)
+        if HAS_REQUESTS:
+            digest = _download_stream(url, part_path)
+        else:
+            urllib.request.urlretrieve(url, part_path, reporthook=progress_hook)
+            digest = None
         print("\n✓ Download complete!")
-        return True
+        return _finalize_download(part_path, dest_path, digest, expected_sha256)
     except urllib.error.URLError as e:
         print(f"\n✗ Download failed: {e}", file=sys.stderr)
         return False
@@ -69,18 +296,30 @@ def verify_file(file_path: Path, expected_size_mb: int = None):
     
     return True, f"File verified: {actual_size_mb:.1f} MB"
 
+def _plan(weights_dir: str):
+    """(이름, 정보, 대상 경로) 튜플 목록 생성 (경로/딕셔너리 조회 1회화)"""
+    base = Path(weights_dir)
+    return [(name, info, base / f"{name}.pth") for name, info in MODELS.items()]
+
+
 def download_model(model_name: str, weights_dir: str = "weights", force: bool = False):
     """모델 다운로드"""
     if model_name not in MODELS:
         print(f"ERROR: Unknown model: {model_name}", file=sys.stderr)
         return False
-    
-    model_info = MODELS[model_name]
-    model_path = Path(weights_dir) / f"{model_name}.pth"
-    
+
+    return _download_planned(model_name, MODELS[model_name], Path(weights_dir) / f"{model_name}.pth", force)
+
+
+def _download_planned(model_name: str, model_info: dict, model_path: Path, force: bool = False):
+    """플랜 엔트리 하나 다운로드 (경로/정보는 호출 측에서 미리 계산)"""
     # 이미 존재하는 경우
     if model_path.exists() and not force:
         is_valid, message = verify_file(model_path, model_info.get("size_mb"))
+        # 크기(±10%)만으로는 이전 버전이 남긴 손상 파일을 걸러내지 못하므로
+        # 해시가 알려진 모델은 exists 경로에서도 SHA-256을 확인한다
+        if is_valid and not _check_digest(model_path, None, model_info.get("sha256")):
+            is_valid, message = False, "SHA-256 mismatch"
         if is_valid:
             print(f"✓ Model {model_name} already exists: {model_path}")
             print(f"  {message}")
@@ -93,7 +332,8 @@ def download_model(model_name: str, weights_dir: str = "weights", force: bool =
     success = download_file(
         model_info["url"],
         model_path,
-        f"{model_name} ({model_info['description']})"
+        f"{model_name} ({model_info['description']})",
+        expected_sha256=model_info.get("sha256")
     )
     
     if success:
@@ -117,10 +357,22 @@ def download_all_models(weights_dir: str = "weights", force: bool = False):
     weights_path = Path(weights_dir)
     weights_path.mkdir(parents=True, exist_ok=True)
     
+    # 모든 모델을 동시에 다운로드 (I/O 병렬화로 전체 대기 시간 단축)
+    plan = _plan(weights_dir)
     results = {}
-    for model_name in MODELS.keys():
-        print(f"\n[{model_name}]")
-        results[model_name] = download_model(model_name, weights_dir, force)
+    with ThreadPoolExecutor(max_workers=min(8, len(plan))) as executor:
+        futures = {
+            executor.submit(_download_planned, name, info, path, force): name
+            for name, info, path in plan
+        }
+        for future in as_completed(futures):
+            model_name = futures[future]
+            print(f"\n[{model_name}]")
+            try:
+                results[model_name] = future.result()
+            except Exception as e:
+                print(f"✗ {model_name} download failed: {e}", file=sys.stderr)
+                results[model_name] = False
     
     print("\n" + "=" * 60)
     print("SUMMARY")
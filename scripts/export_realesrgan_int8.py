@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RealESRGAN 생성기 INT8 ONNX 내보내기 스크립트
+CPU 추론용: torch.onnx.export 후 onnxruntime 동적 양자화(QInt8) 적용
+결과 파일(weights/esrgan_int8.onnx)이 있으면 mosaic_superrecon.py의
+CPU 경로가 자동으로 이를 사용한다 (INT8 SIMD로 FP32 대비 ~4x 처리량)
+"""
+
+import argparse
+import os
+import sys
+
+# UTF-8 인코딩 강제 설정 (Windows 환경 대응)
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+
+try:
+    import torch
+except ImportError as e:
+    print(f"ERROR: Required library not installed: {e}", file=sys.stderr)
+    print("INFO: Please install: pip install -r requirements.txt", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    from realesrgan import RealESRGAN
+except ImportError:
+    print("ERROR: realesrgan not installed: pip install realesrgan", file=sys.stderr)
+    sys.exit(1)
+
+
+def export_int8(weights_path, output_path):
+    """가중치 로드 → ONNX 내보내기 → 동적 INT8 양자화"""
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError:
+        print("ERROR: onnxruntime not installed: pip install onnxruntime", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"INFO: [Export] Loading weights from {weights_path}...", file=sys.stderr)
+    model = RealESRGAN("cpu", scale=4)
+    model.load_weights(weights_path)
+    net = model.model.eval()
+
+    fp32_path = os.path.splitext(output_path)[0] + "_fp32.onnx"
+    dummy = torch.randn(1, 3, 256, 256)
+
+    print(f"INFO: [Export] Exporting ONNX graph to {fp32_path}...", file=sys.stderr)
+    torch.onnx.export(
+        net, dummy, fp32_path,
+        opset_version=17,
+        input_names=["input"], output_names=["output"],
+        dynamic_axes={
+            "input": {0: "batch", 2: "height", 3: "width"},
+            "output": {0: "batch", 2: "height", 3: "width"},
+        },
+    )
+
+    print(f"INFO: [Export] Applying dynamic INT8 quantization...", file=sys.stderr)
+    quantize_dynamic(fp32_path, output_path, weight_type=QuantType.QInt8)
+
+    fp32_mb = os.path.getsize(fp32_path) / 1024 / 1024
+    int8_mb = os.path.getsize(output_path) / 1024 / 1024
+    print(f"INFO: [Export] FP32: {fp32_mb:.1f} MB → INT8: {int8_mb:.1f} MB", file=sys.stderr)
+    print(f"INFO: [Export] Done: {output_path}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export RealESRGAN generator to INT8 ONNX for fast CPU inference")
+    weights_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "weights")
+    parser.add_argument("--weights", default=os.path.join(weights_dir, "RealESRGAN_x4plus.pth"),
+                        help="Path to RealESRGAN .pth weights")
+    parser.add_argument("--output", default=os.path.join(weights_dir, "esrgan_int8.onnx"),
+                        help="Output path for the quantized ONNX model")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.weights):
+        print(f"ERROR: Weights not found: {args.weights}", file=sys.stderr)
+        print("INFO: Run: python scripts/download_models.py", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        export_int8(args.weights, args.output)
+    except Exception as e:
+        print(f"ERROR: Export failed: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc(file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
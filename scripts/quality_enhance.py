@@ -10,6 +10,8 @@ import argparse
 import os
 import sys
 import io
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 
 # UTF-8 인코딩 강제 설정 (Windows 환경 대응)
 if sys.platform == "win32":
@@ -19,9 +21,6 @@ if sys.platform == "win32":
 try:
     import cv2
     import numpy as np
-    from PIL import Image
-    import torch
-    import torch.nn.functional as F
 except ImportError as e:
     error_msg = f"Required library not installed: {e}"
     install_msg = "Please install: pip install -r requirements.txt"
@@ -30,28 +29,365 @@ except ImportError as e:
     sys.exit(1)
 
 # RealESRGAN은 선택적 (없으면 고품질 폴백 사용)
-HAS_REALESRGAN = False
-try:
-    from realesrgan import RealESRGANer
-    HAS_REALESRGAN = True
+# find_spec은 모듈 코드를 실행하지 않으므로 torch 연쇄 import(~1.5s) 없이
+# 설치 여부만 확인한다. 실제 import는 모델 경로를 탈 때만 수행
+HAS_REALESRGAN = importlib.util.find_spec("realesrgan") is not None
+if HAS_REALESRGAN:
     print("INFO: RealESRGAN library found - AI model will be used", file=sys.stderr)
-except Exception as e:
-    # 모든 예외를 잡아서 상세 정보 출력
-    import traceback
-    error_type = type(e).__name__
-    error_msg = str(e)
-    print(f'WARNING: realesrgan import failed: {error_type}: {error_msg}', file=sys.stderr)
-    print('DEBUG: Full traceback:', file=sys.stderr)
-    traceback.print_exc(file=sys.stderr)
-    print('INFO: Using high-quality fallback', file=sys.stderr)
-    print('INFO: Continuing with enhanced upscaling...', file=sys.stderr)
-
-
-def preprocess_image(img_pil):
+else:
+    print("WARNING: realesrgan not installed", file=sys.stderr)
+    print("INFO: Using high-quality fallback", file=sys.stderr)
+
+# torch 지연 import용 슬롯 (폴백 경로에서는 아예 로드하지 않는다)
+torch = None
+
+
+def _load_torch():
+    """torch 지연 import - 시작 지연을 모델 경로에서만 지불"""
+    global torch
+    if torch is not None:
+        return
+    # BLAS/OpenMP 스레드 풀이 처음부터 적정 크기로 생성되도록 import 전에 설정
+    threads = str(min(4, os.cpu_count() or 4))
+    os.environ.setdefault("OMP_NUM_THREADS", threads)
+    os.environ.setdefault("MKL_NUM_THREADS", threads)
+    try:
+        import torch as _torch
+    except ImportError as e:
+        print(f"ERROR: Required library not installed: {e}", file=sys.stderr)
+        print("INFO: Please install: pip install -r requirements.txt", file=sys.stderr)
+        sys.exit(1)
+    torch = _torch
+
+
+# numba는 선택적 (없으면 numpy 정수 블렌드 폴백)
+HAS_NUMBA = False
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _blend_lab(orig_lab, enh_lab):
+        """크로마 90/10 블렌드를 인터리브드 LAB 버퍼에 제자리 1패스 수행
+
+        cvtColor/split/addWeighted/merge로 전체 버퍼를 여러 번 순회하는
+        대신 행 단위 병렬(prange)로 한 번만 읽고 쓴다. 230/256, 26/256은
+        0.9/0.1 가중치의 8비트 고정소수점 근사로 나눗셈이 시프트로 내려간다.
+        """
+        h, w = enh_lab.shape[:2]
+        for y in prange(h):
+            for x in range(w):
+                a = np.uint16(orig_lab[y, x, 1]) * 230 + np.uint16(enh_lab[y, x, 1]) * 26
+                b = np.uint16(orig_lab[y, x, 2]) * 230 + np.uint16(enh_lab[y, x, 2]) * 26
+                enh_lab[y, x, 1] = np.uint8(a >> 8)
+                enh_lab[y, x, 2] = np.uint8(b >> 8)
+
+    # 첫 호출의 컴파일 지연을 피하기 위한 워밍업 (cache=True로 재실행 시 즉시 로드)
+    try:
+        _z = np.zeros((2, 2, 3), dtype=np.uint8)
+        _blend_lab(_z, _z.copy())
+        del _z
+    except Exception:
+        HAS_NUMBA = False
+
+
+class _TRTWrapper:
+    """TensorRT 엔진을 RRDBNet 대용으로 감싸는 래퍼 (선택적)
+
+    torch 텐서의 data_ptr를 바인딩에 직접 사용해 별도 버퍼 복사 없이
+    커널 퓨전된 엔진으로 추론한다.
+    """
+
+    def __init__(self, engine_path, device="cuda"):
+        import tensorrt as trt
+
+        self.device = device
+        logger = trt.Logger(trt.Logger.WARNING)
+        with open(engine_path, "rb") as f, trt.Runtime(logger) as runtime:
+            self.engine = runtime.deserialize_cuda_engine(f.read())
+        self.context = self.engine.create_execution_context()
+
+        # 입출력 텐서 이름/정밀도 확인 (TRT 10 텐서 API / 8.x 바인딩 API 모두 지원)
+        if hasattr(self.engine, "get_tensor_name"):
+            names = [self.engine.get_tensor_name(i) for i in range(self.engine.num_io_tensors)]
+            self.input_name, self.output_name = names[0], names[1]
+            trt_dtype = self.engine.get_tensor_dtype(self.input_name)
+        else:
+            self.input_name = self.output_name = None
+            trt_dtype = self.engine.get_binding_dtype(0)
+        self.dtype = torch.float16 if trt_dtype == trt.DataType.HALF else torch.float32
+        # 배치 타일 경로가 next(net.parameters())로 device/dtype을 읽으므로
+        # nn.Module과 같은 시그니처의 파라미터 1개를 흉내낸다
+        self._param = torch.zeros(1, dtype=self.dtype, device=device)
+
+    def parameters(self):
+        yield self._param
+
+    def __call__(self, x):
+        # channels_last 등 비연속 레이아웃은 TRT 바인딩에 쓸 수 없으므로 NCHW 연속화
+        x = x.contiguous().to(device=self.device, dtype=self.dtype)
+
+        # 동적 축 엔진에 현재 입력 형상을 바인딩 - 프로파일 범위 밖이거나
+        # 정적 엔진과 불일치하면 쓰레기 출력을 내보내는 대신 예외를 던져
+        # 호출부의 폴백이 동작하게 한다
+        if self.input_name is not None:
+            ok = self.context.set_input_shape(self.input_name, tuple(x.shape))
+            out_shape = tuple(self.context.get_tensor_shape(self.output_name))
+        else:
+            ok = self.context.set_binding_shape(0, tuple(x.shape))
+            out_shape = tuple(self.context.get_binding_shape(1))
+        if ok is False or any(d < 0 for d in out_shape):
+            raise RuntimeError(f"TensorRT engine rejected input shape {tuple(x.shape)}")
+
+        out = torch.empty(out_shape, dtype=self.dtype, device=self.device)
+        bindings = [int(x.data_ptr()), int(out.data_ptr())]
+        if not self.context.execute_v2(bindings):
+            raise RuntimeError("TensorRT execute_v2 failed")
+        return out
+
+
+def _build_trt_engine(net, engine_path, tile=512):
+    """RRDBNet을 ONNX 경유로 FP16 TensorRT 엔진으로 빌드해 저장 (최초 1회)"""
+    import tensorrt as trt
+
+    onnx_path = engine_path + ".onnx"
+    param = next(net.parameters())
+    dummy = torch.randn(1, 3, tile, tile, device=param.device, dtype=param.dtype)
+    # 동적 축 필수: 배치 타일 경로는 4x3x512x512, RealESRGANer의 내부 타일
+    # 루프는 1x3x532x532(tile_pad 포함)와 더 작은 가장자리 타일을 먹인다
+    torch.onnx.export(net, dummy, onnx_path, opset_version=17,
+                      input_names=["input"], output_names=["output"],
+                      dynamic_axes={"input": {0: "batch", 2: "height", 3: "width"},
+                                    "output": {0: "batch", 2: "height", 3: "width"}})
+
+    logger = trt.Logger(trt.Logger.WARNING)
+    builder = trt.Builder(logger)
+    network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+    parser = trt.OnnxParser(network, logger)
+    with open(onnx_path, "rb") as f:
+        if not parser.parse(f.read()):
+            raise RuntimeError("ONNX parse failed while building TensorRT engine")
+
+    config = builder.create_builder_config()
+    config.set_flag(trt.BuilderFlag.FP16)
+    # 두 호출 경로의 실제 형상을 모두 포괄하는 최적화 프로파일
+    profile = builder.create_optimization_profile()
+    profile.set_shape("input", (1, 3, 16, 16), (4, 3, tile, tile), (4, 3, 1088, 1088))
+    config.add_optimization_profile(profile)
+    engine_bytes = builder.build_serialized_network(network, config)
+    if engine_bytes is None:
+        raise RuntimeError("TensorRT engine build failed")
+    with open(engine_path, "wb") as f:
+        f.write(engine_bytes)
+    print(f"INFO: [TensorRT] Engine built and cached: {engine_path}", file=sys.stderr)
+
+
+def _apply_trt_engine(model, engine_path):
+    """엔진 적용 (없으면 빌드 후 캐시). 실패 시 eager 모델 유지"""
+    try:
+        if not os.path.exists(engine_path):
+            print(f"INFO: [TensorRT] Building engine (first use): {engine_path}", file=sys.stderr)
+            _build_trt_engine(model.model, engine_path)
+        model.model = _TRTWrapper(engine_path)
+        print(f"INFO: [TensorRT] Engine loaded: {engine_path}", file=sys.stderr)
+    except Exception as e:
+        print(f"WARNING: [TensorRT] Engine unavailable ({e}), using eager model", file=sys.stderr)
+
+
+def _should_compile(flag, daemon=False):
+    """--compile 판정: auto는 inductor가 안정화된 torch 2.1+에서, 그리고
+    컴파일 워밍업(콜드 캐시에서 분 단위)이 상환되는 --daemon 모드에서만 켠다.
+    단건 실행은 forward 1회에 그 비용을 다 떠안으므로 on으로 명시해야 켜진다.
+    """
+    if flag == "off":
+        return False
+    if flag == "on":
+        return True
+    if not daemon:
+        return False
+    try:
+        major, minor = (int(x) for x in torch.__version__.split(".")[:2])
+        return (major, minor) >= (2, 1)
+    except Exception:
+        return False
+
+
+def _compile_model(model, device):
+    """생성기 컴파일로 23개 RRDB 블록의 op별 디스패치 비용 제거
+
+    CUDA는 torch.compile(reduce-overhead)로 포인트와이즈 op(leaky-ReLU,
+    residual add)를 단일 커널로 퓨전하고, CPU는 jit.trace로 파이썬
+    디스패치를 걷어낸다. 실패 시 eager 모델 유지.
+    """
+    try:
+        if device == "cuda":
+            model.model = torch.compile(model.model, mode="reduce-overhead", fullgraph=False)
+            print("INFO: [Compile] torch.compile(reduce-overhead) applied", file=sys.stderr)
+        else:
+            param = next(model.model.parameters())
+            example = torch.randn(1, 3, 64, 64, dtype=param.dtype)
+            model.model = torch.jit.trace(model.model, example)
+            print("INFO: [Compile] torch.jit.trace applied (CPU)", file=sys.stderr)
+    except Exception as e:
+        print(f"WARNING: [Compile] compile failed ({e}), using eager model", file=sys.stderr)
+
+
+def _upscale_tiles_batched(model, img_array, tile=512, overlap=32, batch_size=4,
+                           channels_last=False):
+    """RealESRGANer 내부 네트워크로 타일을 배치 추론 (BGR 입력 → BGR 출력)
+
+    model.enhance의 내부 타일 루프는 타일마다 forward를 1회씩 호출해
+    디스패치 오버헤드가 쌓이고 GPU SM이 놀게 된다. 동일 크기로 reflect
+    패딩한 타일을 NCHW 배치로 묶어 model.model을 직접 호출하고, 겹침
+    영역은 Hann 창 가중 합산으로 이음새 없이 합친다. 채널 스왑은 복사에
+    얹히는 뒤집힌 뷰로 처리해 별도 cvtColor 패스가 없다.
+    """
+    net = model.model
+    param = next(net.parameters())
+    device, dtype = param.device, param.dtype
+
+    h, w = img_array.shape[:2]
+    stride = tile - overlap
+
+    boxes = []
+    tiles = []
+    for y in range(0, h, stride):
+        for x in range(0, w, stride):
+            th = min(y + tile, h) - y
+            tw = min(x + tile, w) - x
+            patch = img_array[y:y + th, x:x + tw]
+            if th < tile or tw < tile:
+                patch = cv2.copyMakeBorder(patch, 0, tile - th, 0, tile - tw, cv2.BORDER_REFLECT_101)
+            boxes.append((x, y, tw, th))
+            tiles.append(patch)
+
+    # 겹침 영역은 이미 계산된 값이므로 덮어쓰지 않고 Hann 창으로 가중 합산해
+    # 이음새 없이 섞는다 (양끝 0을 제외한 창이라 경계 픽셀도 가중치 > 0)
+    out_tile = tile * 4
+    wy = np.hanning(out_tile + 2)[1:-1].astype(np.float32)
+    window = np.outer(wy, wy)[..., None]
+
+    acc = np.zeros((h * 4, w * 4, 3), dtype=np.float32)
+    weight = np.zeros((h * 4, w * 4, 1), dtype=np.float32)
+    with torch.inference_mode():
+        for i in range(0, len(tiles), batch_size):
+            # BGR→RGB는 뒤집힌 뷰로 처리 (astype가 어차피 복사하므로 추가 비용 없음)
+            batch = np.stack(tiles[i:i + batch_size])[..., ::-1].astype(np.float32) / 255.0
+            tensor = torch.from_numpy(batch).permute(0, 3, 1, 2).to(device=device, dtype=dtype)
+            if channels_last:
+                # NHWC 레이아웃으로 cudnn Tensor Core 커널 경로 사용
+                tensor = tensor.contiguous(memory_format=torch.channels_last)
+            out = net(tensor)
+            out = out.float().clamp_(0, 1).mul_(255.0).permute(0, 2, 3, 1).cpu().numpy()
+            for (x, y, tw, th), tile_out in zip(boxes[i:i + batch_size], out):
+                # 패딩으로 늘어난 영역은 잘라내고 유효 영역만 RGB→BGR로 가중 누적
+                win = window[:th * 4, :tw * 4]
+                acc[y * 4:(y + th) * 4, x * 4:(x + tw) * 4] += tile_out[:th * 4, :tw * 4, ::-1] * win
+                weight[y * 4:(y + th) * 4, x * 4:(x + tw) * 4] += win
+
+    acc /= weight
+    acc += 0.5
+    return acc.astype(np.uint8)
+
+
+# CLAHE 객체 캐시 (생성 시 히스토그램 버퍼 할당이 일어나므로 재사용)
+_CLAHE_CACHE = {}
+
+
+def _get_clahe(clip_limit, tile_grid):
+    key = (clip_limit, tile_grid)
+    if key not in _CLAHE_CACHE:
+        _CLAHE_CACHE[key] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid)
+    return _CLAHE_CACHE[key]
+
+
+# OpenCL(T-API) 사용 가능 여부 (1회 프로브 후 캐시)
+_OPENCL_OK = None
+
+
+def _use_opencl():
+    """iGPU/dGPU OpenCL 오프로드 가능 여부 - CUDA가 없는 환경의 필터 가속용"""
+    global _OPENCL_OK
+    if _OPENCL_OK is None:
+        try:
+            cv2.ocl.setUseOpenCL(True)
+            _OPENCL_OK = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+        except Exception:
+            _OPENCL_OK = False
+        if _OPENCL_OK:
+            print("INFO: [OpenCL] T-API offload enabled", file=sys.stderr)
+    return _OPENCL_OK
+
+
+# libjpeg-turbo 디코더 (선택적, 최초 사용 시 1회 로드)
+_TURBOJPEG = None
+
+
+def _load_image(path):
+    """이미지 로드: JPEG은 가능하면 libjpeg-turbo로 BGR ndarray에 직접 디코드
+
+    turbojpeg는 SIMD(AVX2/NEON) 디코드 경로를 쓰고 픽셀 포맷을 BGR로
+    지정할 수 있어 중간 버퍼/채널 스왑이 없다. 미설치·실패 시 cv2.imread.
+    """
+    global _TURBOJPEG
+    if os.path.splitext(path)[1].lower() in (".jpg", ".jpeg"):
+        if _TURBOJPEG is None:
+            try:
+                from turbojpeg import TurboJPEG, TJPF_BGR
+                _TURBOJPEG = (TurboJPEG(), TJPF_BGR)
+            except Exception:
+                _TURBOJPEG = False
+        if _TURBOJPEG:
+            try:
+                with open(path, "rb") as f:
+                    return _TURBOJPEG[0].decode(f.read(), pixel_format=_TURBOJPEG[1])
+            except Exception as e:
+                print(f"WARNING: [Image Loading] turbojpeg decode failed ({e}), using cv2.imread", file=sys.stderr)
+    return cv2.imread(path, cv2.IMREAD_COLOR)
+
+
+def _filter_strips(img, fn, radius):
+    """이미지를 수평 스트립으로 나눠 국소 필터를 스레드 병렬 적용
+
+    OpenCV C++ 함수는 GIL을 해제하므로 파이썬 스레드로도 코어를 채울 수
+    있다. 과점유를 피하려고 병렬 구간 동안 cv2 내부 스레드를 1로 줄였다가
+    복원한다. 각 스트립에 커널 반경만큼 halo를 붙여 처리한 뒤 유효 영역만
+    잘라내므로 결과가 전체 이미지 1회 처리와 비트 단위로 동일하다
+    (이음새 블렌딩 불필요).
+    """
+    h = img.shape[0]
+    workers = max(1, (os.cpu_count() or 2) // 2)
+    if workers == 1 or h < workers * radius * 8:
+        return fn(img)
+
+    bounds = np.linspace(0, h, workers + 1).astype(int)
+    out = np.empty_like(img)
+
+    def _run(i):
+        y0, y1 = bounds[i], bounds[i + 1]
+        top = max(0, y0 - radius)
+        bot = min(h, y1 + radius)
+        strip = fn(img[top:bot])
+        out[y0:y1] = strip[y0 - top:y0 - top + (y1 - y0)]
+
+    prev = cv2.getNumThreads()
+    cv2.setNumThreads(1)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_run, range(workers)))
+    finally:
+        cv2.setNumThreads(prev)
+    return out
+
+
+def preprocess_image(img_cv):
     """이미지 전처리: 최소한의 노이즈 감소만 (원본 보존)"""
     print("INFO: [Preprocessing] Starting minimal preprocessing...", file=sys.stderr)
     # 전처리 최소화 - RealESRGAN이 원본을 최대한 보존하도록
-    return img_pil
+    return img_cv
 
 
 def preserve_color_original(original_cv, enhanced_cv):
@@ -60,50 +396,112 @@ def preserve_color_original(original_cv, enhanced_cv):
     
     # 원본을 업스케일한 버전 생성 (참조용)
     original_upscaled = cv2.resize(original_cv, (enhanced_cv.shape[1], enhanced_cv.shape[0]), interpolation=cv2.INTER_LANCZOS4)
-    
-    # LAB 색공간으로 변환
+
+    # LAB 색공간으로 변환 (왕복 1회, split/merge 평면 복사 없음)
     original_lab = cv2.cvtColor(original_upscaled, cv2.COLOR_BGR2LAB)
     enhanced_lab = cv2.cvtColor(enhanced_cv, cv2.COLOR_BGR2LAB)
-    
-    # L 채널: AI 결과 사용 (선명도)
-    # A, B 채널: 원본 색상 보존 (색상 정보)
-    l_enhanced, a_original, b_original = cv2.split(enhanced_lab)
-    _, a_orig, b_orig = cv2.split(original_lab)
-    
-    # 원본 색상과 블렌딩 (90% 원본 색상, 10% AI 색상)
-    a_blended = cv2.addWeighted(a_orig, 0.9, a_original, 0.1, 0)
-    b_blended = cv2.addWeighted(b_orig, 0.9, b_original, 0.1, 0)
-    
-    # L 채널: 약한 CLAHE로 대비만 약간 향상 (색상 변형 최소화)
-    clahe = cv2.createCLAHE(clipLimit=1.5, tileGridSize=(8, 8))
-    l_enhanced = clahe.apply(l_enhanced)
-    
-    lab_result = cv2.merge([l_enhanced, a_blended, b_blended])
-    result = cv2.cvtColor(lab_result, cv2.COLOR_LAB2BGR)
-    
+
+    # L 채널: 약한 CLAHE로 대비만 약간 향상 (L 평면만 복사해 뷰에 기록)
+    # 4배 업스케일된 프레임이므로 16x16 그리드 - 히스토그램 수가 1/4로 줄고
+    # 타일당 작업은 벡터화되어 있어 총 비용이 낮다
+    clahe = _get_clahe(1.5, (16, 16))
+    enhanced_lab[..., 0] = clahe.apply(np.ascontiguousarray(enhanced_lab[..., 0]))
+
+    # A/B 채널: 원본 색상 90% 블렌딩
+    if HAS_NUMBA:
+        # 융합된 JIT 루프로 양쪽 버퍼를 한 번씩만 순회 (임시 배열 없음)
+        _blend_lab(original_lab, enhanced_lab)
+    else:
+        # numpy 폴백: 정수 연산으로 제자리 수행
+        # ((9*orig + ai + 5) // 10 == 0.9/0.1 가중 평균의 반올림)
+        chroma = original_lab[..., 1:].astype(np.uint16)
+        chroma *= 9
+        chroma += enhanced_lab[..., 1:]
+        chroma += 5
+        chroma //= 10
+        enhanced_lab[..., 1:] = chroma.astype(np.uint8)
+
+    result = cv2.cvtColor(enhanced_lab, cv2.COLOR_LAB2BGR)
+
     print("INFO: [Color Preservation] Original color preserved", file=sys.stderr)
     return result
 
 
-def enhance_sharpness_preserve_color(img_cv, original_cv):
-    """선명도 강화 (원본 색상 보존)"""
-    print("INFO: [Sharpness] Enhancing sharpness while preserving colors...", file=sys.stderr)
-    
-    # Unsharp Masking (약한 강도)
-    gaussian = cv2.GaussianBlur(img_cv, (0, 0), 1.5)
-    unsharp = cv2.addWeighted(img_cv, 1.3, gaussian, -0.3, 0)
-    
-    # 약한 샤프닝 필터 (아티팩트 최소화)
-    kernel = np.array([
+def _compose_sharpen_kernel():
+    """언샤프 마스크(σ=1.5, 1.3/-0.3)와 3x3 샤프닝 필터를 하나로 합성
+
+    컨볼루션은 선형이므로 blur→addWeighted→filter2D 3패스를 13x13 커널
+    1패스로 접을 수 있다. 전체 버퍼 읽기/쓰기가 패스 수만큼 줄어
+    대역폭 병목인 4배 업스케일 이미지에서 효과가 크다.
+    """
+    # GaussianBlur((0,0), 1.5)가 8비트에서 고르는 커널 크기와 동일하게 구성
+    g1 = cv2.getGaussianKernel(11, 1.5).astype(np.float32)
+    k_unsharp = -0.3 * (g1 @ g1.T)
+    k_unsharp[5, 5] += 1.3
+
+    k_cross = np.array([
         [0, -0.2, 0],
         [-0.2, 1.8, -0.2],
         [0, -0.2, 0]
-    ])
-    sharpened = cv2.filter2D(unsharp, -1, kernel)
-    
+    ], dtype=np.float32)
+
+    k = np.zeros((13, 13), dtype=np.float32)
+    for dy in range(3):
+        for dx in range(3):
+            k[dy:dy + 11, dx:dx + 11] += k_cross[dy, dx] * k_unsharp
+    return k
+
+
+_SHARPEN_KERNEL = _compose_sharpen_kernel()
+
+# GPU 샤프닝용 커널 텐서 (최초 사용 시 1회 업로드 후 재사용)
+_SHARPEN_TENSOR = None
+
+
+def _sharpen_gpu(img_cv):
+    """합성 샤프닝 커널을 CUDA depthwise conv로 적용 (H2D/D2H 각 1회)
+
+    4배 업스케일 후 CPU filter2D는 프레임당 수백 ms의 직렬 작업인데,
+    conv2d(groups=3)는 같은 커널을 GPU에서 돌리고 uint8 양자화까지
+    디바이스에서 마친 뒤 최종 결과만 내려받는다.
+    """
+    global _SHARPEN_TENSOR
+    if _SHARPEN_TENSOR is None:
+        k = torch.from_numpy(_SHARPEN_KERNEL)[None, None].repeat(3, 1, 1, 1)
+        _SHARPEN_TENSOR = k.cuda()
+    t = torch.from_numpy(img_cv).cuda().permute(2, 0, 1)[None].float()
+    t = torch.nn.functional.pad(t, (6, 6, 6, 6), mode="replicate")
+    out = torch.nn.functional.conv2d(t, _SHARPEN_TENSOR, groups=3)
+    return out.round_().clamp_(0, 255).byte()[0].permute(1, 2, 0).cpu().numpy()
+
+
+def enhance_sharpness_preserve_color(img_cv, original_cv):
+    """선명도 강화 (원본 색상 보존)"""
+    print("INFO: [Sharpness] Enhancing sharpness while preserving colors...", file=sys.stderr)
+
+    # CUDA가 있으면 GPU conv로, 없으면 합성 커널 1패스 (스트립 병렬, halo=커널 반경 6)
+    sharpened = None
+    if torch is not None and torch.cuda.is_available():
+        try:
+            sharpened = _sharpen_gpu(img_cv)
+        except Exception as e:
+            print(f"WARNING: [Sharpness] GPU sharpen failed ({e}), using CPU path", file=sys.stderr)
+    if sharpened is None and _use_opencl():
+        # UMat 입력이면 filter2D가 OpenCL 커널로 디스패치됨 (iGPU 오프로드)
+        try:
+            sharpened = cv2.filter2D(cv2.UMat(img_cv), -1, _SHARPEN_KERNEL,
+                                     borderType=cv2.BORDER_REPLICATE).get()
+        except Exception as e:
+            print(f"WARNING: [Sharpness] OpenCL sharpen failed ({e}), using CPU path", file=sys.stderr)
+    if sharpened is None:
+        sharpened = _filter_strips(
+            img_cv,
+            lambda s: cv2.filter2D(s, -1, _SHARPEN_KERNEL, borderType=cv2.BORDER_REPLICATE),
+            radius=6)
+
     # 원본 색상과 블렌딩 (색상 보존)
     result = preserve_color_original(original_cv, sharpened)
-    
+
     print("INFO: [Sharpness] Sharpness enhanced", file=sys.stderr)
     return result
 
@@ -113,37 +511,43 @@ def remove_artifacts(img_cv):
     print("INFO: [Artifact Removal] Removing artifacts...", file=sys.stderr)
     
     # 약한 bilateral filter만 적용 (디테일 보존)
-    result = cv2.bilateralFilter(img_cv, 3, 30, 30)
+    result = None
+    if _use_opencl():
+        try:
+            result = cv2.bilateralFilter(cv2.UMat(img_cv), 3, 30, 30).get()
+        except Exception as e:
+            print(f"WARNING: [Artifact Removal] OpenCL bilateral failed ({e}), using CPU path", file=sys.stderr)
+    if result is None:
+        result = _filter_strips(img_cv, lambda s: cv2.bilateralFilter(s, 3, 30, 30), radius=2)
     
     print("INFO: [Artifact Removal] Artifacts removed", file=sys.stderr)
     return result
 
 
-def postprocess_image_enhanced(sr_img_pil, original_img_pil):
-    """원본 색상 보존 후처리 파이프라인"""
+def postprocess_image_enhanced(sr_cv, original_cv):
+    """원본 색상 보존 후처리 파이프라인 (BGR ndarray 입출력)"""
     print("INFO: [Postprocessing] Starting color-preserving postprocessing...", file=sys.stderr)
-    
-    sr_cv = cv2.cvtColor(np.array(sr_img_pil), cv2.COLOR_RGB2BGR)
-    original_cv = cv2.cvtColor(np.array(original_img_pil), cv2.COLOR_RGB2BGR)
-    
+
     # 1. 원본 색상 보존하면서 선명도 강화
     result = enhance_sharpness_preserve_color(sr_cv, original_cv)
-    
+
     # 2. 아티팩트 제거 (최소한만)
     result = remove_artifacts(result)
-    
+
     print("INFO: [Postprocessing] Color-preserving postprocessing complete", file=sys.stderr)
-    return Image.fromarray(cv2.cvtColor(result, cv2.COLOR_BGR2RGB))
+    return result
 
 
 def verify_model_execution(original_img, enhanced_img):
     """모델이 실제로 실행되었는지 검증"""
-    orig_array = np.array(original_img)
-    enh_array = np.array(enhanced_img)
+    orig_array = np.asarray(original_img)
+    enh_array = np.asarray(enhanced_img)
     
     size_ratio = (enh_array.shape[0] * enh_array.shape[1]) / (orig_array.shape[0] * orig_array.shape[1])
-    orig_var = np.var(orig_array)
-    enh_var = np.var(enh_array)
+    # 진단용 수치이므로 8픽셀 간격 데시메이션 뷰로 충분 (64배 적은 작업,
+    # 전체 버퍼 크기의 float64 임시 배열 생성도 피함)
+    orig_var = np.var(orig_array[::8, ::8])
+    enh_var = np.var(enh_array[::8, ::8])
     
     if size_ratio >= 3.5:
         print(f"INFO: [Verification] Size ratio: {size_ratio:.2f}x (expected ~4.0x)", file=sys.stderr)
@@ -155,138 +559,250 @@ def verify_model_execution(original_img, enhanced_img):
 
 
 
-def main():
-    parser = argparse.ArgumentParser(description="딥러닝 초해상도 화질 개선")
-    parser.add_argument("--input", required=True, help="입력 이미지 경로")
-    parser.add_argument("--output", required=True, help="출력 이미지 경로")
-    parser.add_argument("--scale", default="2.0", help="스케일 배율 (1.0 ~ 4.0)")
-    parser.add_argument("--model", default="RealESRGAN_x4plus", help="모델 이름 (기본: RealESRGAN_x4plus)")
-    args = parser.parse_args()
+def _load_model(args, model_path):
+    """모델 1회 로드 (데몬 모드에서 호출 간 재사용)
 
-    scale = float(args.scale)
-    if scale <= 1.0 or scale > 4.0:
-        print(f"ERROR: scale must be between 1.0 and 4.0 (current: {scale})", file=sys.stderr)
-        sys.exit(1)
+    성공 시 (model, device, use_half, use_channels_last) 반환,
+    폴백 경로(라이브러리/가중치 없음 또는 로드 실패)면 None.
+    """
+    if not (HAS_REALESRGAN and os.path.exists(model_path)):
+        if not os.path.exists(model_path):
+            print(f"WARNING: [Model Loading] Model file not found: {model_path}", file=sys.stderr)
+        if not HAS_REALESRGAN:
+            print("WARNING: [Model Loading] RealESRGAN library not available", file=sys.stderr)
+        return None
+
+    # torch는 모델 경로에서만 필요 (폴백 경로는 import 비용을 내지 않음)
+    _load_torch()
 
     # GPU/CPU 자동 인식
     device = "cuda" if torch.cuda.is_available() else "cpu"
     print(f"INFO: [Device Detection] Device: {device}", file=sys.stderr)
-    
+
+    use_half = False
+    use_channels_last = False
     if device == "cuda":
         print(f"INFO: [Device Detection] GPU: {torch.cuda.get_device_name(0)}", file=sys.stderr)
         print(f"INFO: [Device Detection] CUDA enabled - using GPU acceleration", file=sys.stderr)
+        # 타일 크기가 고정이므로 cudnn 커널 오토튠이 첫 타일 이후 상환됨
+        torch.backends.cudnn.benchmark = True
+        # TF32(19비트 가수) 텐서 코어 경로 허용 - 기본값 highest는 Ampere+의
+        # FP32 고속 경로를 꺼 둔다. SR에서는 시각적으로 구분 불가
+        torch.set_float32_matmul_precision("high")
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        # FP16은 Tensor Core가 있는 Volta(7.0)+ 에서만 이득 (이전 세대는 FP32 유지)
+        major, _minor = torch.cuda.get_device_capability()
+        use_half = major >= 7
+        print(f"INFO: [Device Detection] FP16 inference: {'enabled' if use_half else 'disabled (compute capability < 7.0)'}", file=sys.stderr)
+        # NHWC는 모델/세대에 따라 득실이 갈리므로 auto는 Ampere+에서만
+        if args.channels_last == "on":
+            use_channels_last = True
+        elif args.channels_last == "auto":
+            use_channels_last = major >= 8
+        print(f"INFO: [Device Detection] channels_last: {'enabled' if use_channels_last else 'disabled'}", file=sys.stderr)
     else:
         print("INFO: [Device Detection] CPU mode - RealESRGAN will run on CPU", file=sys.stderr)
         # CPU 스레드 최적화
         torch.set_num_threads(min(4, os.cpu_count() or 4))
         print(f"INFO: [Device Detection] CPU threads: {torch.get_num_threads()}", file=sys.stderr)
 
+    try:
+        from realesrgan import RealESRGANer
+
+        print("INFO: [Model Loading] Loading Real-ESRGAN model...", file=sys.stderr)
+        print(f"INFO: [Model Loading] Model path: {model_path}", file=sys.stderr)
+        print(f"INFO: [Model Loading] Target device: {device}", file=sys.stderr)
+
+        # RealESRGANer 사용 (올바른 클래스)
+        model = RealESRGANer(
+            scale=4,
+            model_path=model_path,
+            model=None,
+            tile=512,
+            tile_pad=10,
+            pre_pad=0,
+            half=use_half,
+            gpu_id=0 if device == "cuda" else None
+        )
+        print("INFO: [Model Loading] Model loaded successfully", file=sys.stderr)
+
+        if use_channels_last:
+            model.model = model.model.to(memory_format=torch.channels_last)
+
+        # TensorRT 엔진 캐시: RRDB forward가 지배 비용이므로
+        # 커널 퓨전된 엔진으로 1.7-2.4x 추론 단축 (Ampere+)
+        if args.trt_engine and device == "cuda":
+            _apply_trt_engine(model, args.trt_engine)
+        elif _should_compile(args.compile, daemon=args.daemon):
+            # TRT 엔진이 모델을 대체하지 않은 경우에만 컴파일
+            _compile_model(model, device)
+
+        return (model, device, use_half, use_channels_last)
+    except Exception as e:
+        print(f"ERROR: [Model Loading] RealESRGAN load failed: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc(file=sys.stderr)
+        print("INFO: [Fallback] Using high-quality Lanczos upscaling", file=sys.stderr)
+        return None
+
+
+def _process_one(input_path, output_path, scale, bundle):
+    """이미지 1장 처리: 로드 → SR → 후처리 → 저장 (모델은 bundle로 재사용)"""
+    # 이미지 로드 (BGR ndarray로 파이프라인 전체 유지 - PIL 왕복 복사 제거)
+    print(f"INFO: [Image Loading] Loading image: {input_path}", file=sys.stderr)
+    img = _load_image(input_path)
+    if img is None:
+        raise RuntimeError(f"Failed to load image: {input_path}")
+    original_size = (img.shape[1], img.shape[0])
+    print(f"INFO: [Image Loading] Original size: {original_size[0]} x {original_size[1]}", file=sys.stderr)
+
+    # 원본 이미지 백업 (색상 보존용, 파이프라인이 입력을 제자리 수정하지 않으므로 참조로 충분)
+    original_img_backup = img
+
+    # 전처리 (최소화)
+    preprocessed_img = preprocess_image(img)
+
+    sr_img = None
+    if bundle is not None:
+        model, device, use_half, use_channels_last = bundle
+        try:
+            # RealESRGAN 모델 실행 (CPU에서도 실행)
+            print("INFO: [Upscaling] Processing with Real-ESRGAN (4x upscale)...", file=sys.stderr)
+            print(f"INFO: [Upscaling] Using {device} for inference", file=sys.stderr)
+
+            # 타일 분할이 필요한 크기면 배치 타일 경로 우선 시도
+            output = None
+            if preprocessed_img.shape[0] * preprocessed_img.shape[1] > 512 * 512:
+                try:
+                    output = _upscale_tiles_batched(model, preprocessed_img,
+                                                    channels_last=use_channels_last)
+                    print("INFO: [Upscaling] Batched tile inference complete", file=sys.stderr)
+                except Exception as e:
+                    print(f"WARNING: [Upscaling] Batched tiles failed ({e}), using model.enhance", file=sys.stderr)
+
+            if output is None:
+                # RealESRGANer.enhance는 BGR 입출력이므로 채널 스왑 불필요
+                if device == "cuda":
+                    # inference_mode로 autograd 부기 제거 + autocast로 활성값도
+                    # FP16 경로에 태워 Tensor Core 활용 (HBM 이동량 절반)
+                    with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16, enabled=use_half):
+                        output, _ = model.enhance(preprocessed_img, outscale=4)
+                else:
+                    with torch.inference_mode():
+                        output, _ = model.enhance(preprocessed_img, outscale=4)
+            sr_img = output
+            print("INFO: [Upscaling] RealESRGAN inference complete", file=sys.stderr)
+
+            sr_size = (sr_img.shape[1], sr_img.shape[0])
+            print(f"INFO: [Upscaling] After 4x upscale (AI): {sr_size[0]} x {sr_size[1]}", file=sys.stderr)
+
+            # 모델 실행 검증
+            if verify_model_execution(img, sr_img):
+                print("INFO: [Verification] Model execution verified - AI upscaling applied", file=sys.stderr)
+            else:
+                print("WARNING: [Verification] Model execution verification failed", file=sys.stderr)
+
+        except Exception as e:
+            print(f"ERROR: [Upscaling] RealESRGAN processing failed: {e}", file=sys.stderr)
+            import traceback
+            traceback.print_exc(file=sys.stderr)
+            print("INFO: [Fallback] Using high-quality Lanczos upscaling", file=sys.stderr)
+            sr_img = None
+
+    if sr_img is None:
+        # 고품질 폴백 업스케일링
+        print("INFO: [Fallback] Using high-quality Lanczos upscaling (4x)...", file=sys.stderr)
+        target_w = int(original_size[0] * 4)
+        target_h = int(original_size[1] * 4)
+        sr_img = cv2.resize(preprocessed_img, (target_w, target_h), interpolation=cv2.INTER_LANCZOS4)
+        sr_size = (sr_img.shape[1], sr_img.shape[0])
+        print(f"INFO: [Fallback] After 4x upscale (high-quality resize): {sr_size[0]} x {sr_size[1]}", file=sys.stderr)
+
+    # 원하는 배율로 리사이즈 (4배가 아닌 경우)
+    if scale != 4.0:
+        target_w = int(original_size[0] * scale)
+        target_h = int(original_size[1] * scale)
+        print(f"INFO: [Resizing] Resizing to final size: {target_w} x {target_h}", file=sys.stderr)
+        sr_img = cv2.resize(sr_img, (target_w, target_h), interpolation=cv2.INTER_LANCZOS4)
+        # 원본 리사이즈는 preserve_color_original이 SR 결과 크기에 맞춰
+        # 어차피 수행하므로 여기서 중복으로 하지 않는다
+
+    # 원본 색상 보존 후처리 파이프라인
+    final_img = postprocess_image_enhanced(sr_img, original_img_backup)
+
+    # 출력 디렉토리 생성
+    output_dir = os.path.dirname(output_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+
+    # 이미지 저장 (이미 BGR이므로 변환 없이 바로 기록)
+    # 레벨 0은 무압축 저장이라 파일이 수 배로 커짐 - 레벨 1 + FILTERED가
+    # 비슷한 CPU 비용으로 훨씬 작다 (무손실은 동일)
+    print(f"INFO: [Saving] Saving image: {output_path}", file=sys.stderr)
+    cv2.imwrite(output_path, final_img,
+                [cv2.IMWRITE_PNG_COMPRESSION, 1,
+                 cv2.IMWRITE_PNG_STRATEGY, cv2.IMWRITE_PNG_STRATEGY_FILTERED])
+
+    final_size = final_img.shape[:2][::-1]  # (width, height)
+    print(f"INFO: [Complete] Processing complete: {final_size[0]} x {final_size[1]}", file=sys.stderr)
+    print(f"INFO: [Complete] Quality enhancement applied successfully", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="딥러닝 초해상도 화질 개선")
+    parser.add_argument("--input", default=None, help="입력 이미지 경로")
+    parser.add_argument("--output", default=None, help="출력 이미지 경로")
+    parser.add_argument("--scale", default="2.0", help="스케일 배율 (1.0 ~ 4.0)")
+    parser.add_argument("--model", default="RealESRGAN_x4plus", help="모델 이름 (기본: RealESRGAN_x4plus)")
+    parser.add_argument("--trt-engine", default=None,
+                        help="TensorRT 엔진(.plan) 경로 - 없으면 최초 실행 시 빌드 후 캐시 (CUDA 전용)")
+    parser.add_argument("--channels-last", choices=["auto", "on", "off"], default="auto",
+                        help="NHWC(channels_last) 레이아웃 사용 여부 - auto는 Ampere(SM 8.0)+에서만 켬")
+    parser.add_argument("--compile", choices=["auto", "on", "off"], default="auto",
+                        help="생성기 torch.compile/jit 컴파일 - auto는 --daemon + torch 2.1+에서만 켬")
+    parser.add_argument("--daemon", action="store_true",
+                        help="상주 워커: stdin에서 'input<TAB>output' 라인을 읽어 모델을 유지한 채 반복 처리")
+    args = parser.parse_args()
+
+    if not args.daemon and (not args.input or not args.output):
+        parser.error("--input and --output are required (or use --daemon)")
+
+    scale = float(args.scale)
+    if scale <= 1.0 or scale > 4.0:
+        print(f"ERROR: scale must be between 1.0 and 4.0 (current: {scale})", file=sys.stderr)
+        sys.exit(1)
+
     # 모델 weights 경로
     weights_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "weights")
     model_path = os.path.join(weights_dir, f"{args.model}.pth")
 
-    # 이미지 로드
-    print(f"INFO: [Image Loading] Loading image: {args.input}", file=sys.stderr)
-    img = Image.open(args.input).convert("RGB")
-    original_size = img.size
-    print(f"INFO: [Image Loading] Original size: {original_size[0]} x {original_size[1]}", file=sys.stderr)
-    
-    # 원본 이미지 백업 (색상 보존용)
-    original_img_backup = img.copy()
+    # 모델은 1회만 로드 (데몬 모드에서 가중치 로드/오토튠 비용을 첫 이미지에서만 지불)
+    bundle = _load_model(args, model_path)
 
-    try:
-        # 전처리 (최소화)
-        preprocessed_img = preprocess_image(img)
-        
-        # RealESRGAN 모델 로드 및 실행 (CPU에서도 실행)
-        if HAS_REALESRGAN and os.path.exists(model_path):
+    # 상주 워커 모드: stdin에서 경로 쌍을 읽어 모델을 유지한 채 반복 처리
+    if args.daemon:
+        print("INFO: [Daemon] Persistent worker started - send 'input<TAB>output' lines on stdin", file=sys.stderr)
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split("\t") if "\t" in line else line.split()
+            if len(parts) != 2:
+                print(f"ERROR: [Daemon] Expected 'input<TAB>output', got: {line}", file=sys.stderr)
+                print("FAIL", flush=True)
+                continue
             try:
-                print("INFO: [Model Loading] Loading Real-ESRGAN model...", file=sys.stderr)
-                print(f"INFO: [Model Loading] Model path: {model_path}", file=sys.stderr)
-                print(f"INFO: [Model Loading] Target device: {device}", file=sys.stderr)
-                
-                # RealESRGANer 사용 (올바른 클래스)
-                model = RealESRGANer(
-                    scale=4,
-                    model_path=model_path,
-                    model=None,
-                    tile=512,
-                    tile_pad=10,
-                    pre_pad=0,
-                    half=False if device == "cpu" else True,
-                    gpu_id=0 if device == "cuda" else None
-                )
-                print("INFO: [Model Loading] Model loaded successfully", file=sys.stderr)
-                
-                # RealESRGAN 모델 실행 (CPU에서도 실행)
-                print("INFO: [Upscaling] Processing with Real-ESRGAN (4x upscale)...", file=sys.stderr)
-                print(f"INFO: [Upscaling] Using {device} for inference", file=sys.stderr)
-                
-                # RealESRGANer는 numpy array를 입력으로 받음
-                img_array = np.array(preprocessed_img)
-                output, _ = model.enhance(img_array, outscale=4)
-                sr_img = Image.fromarray(output)
-                print("INFO: [Upscaling] RealESRGAN inference complete", file=sys.stderr)
-                
-                sr_size = sr_img.size
-                print(f"INFO: [Upscaling] After 4x upscale (AI): {sr_size[0]} x {sr_size[1]}", file=sys.stderr)
-                
-                # 모델 실행 검증
-                if verify_model_execution(img, sr_img):
-                    print("INFO: [Verification] Model execution verified - AI upscaling applied", file=sys.stderr)
-                else:
-                    print("WARNING: [Verification] Model execution verification failed", file=sys.stderr)
-                    
+                _process_one(parts[0], parts[1], scale, bundle)
+                print(f"DONE\t{parts[1]}", flush=True)
             except Exception as e:
-                print(f"ERROR: [Model Loading] RealESRGAN processing failed: {e}", file=sys.stderr)
-                import traceback
-                traceback.print_exc(file=sys.stderr)
-                print("INFO: [Fallback] Using high-quality Lanczos upscaling", file=sys.stderr)
-                # 폴백으로 계속 진행
-                target_w = int(original_size[0] * 4)
-                target_h = int(original_size[1] * 4)
-                sr_img = preprocessed_img.resize((target_w, target_h), Image.LANCZOS)
-                sr_size = sr_img.size
-                print(f"INFO: [Fallback] After 4x upscale (Lanczos): {sr_size[0]} x {sr_size[1]}", file=sys.stderr)
-        else:
-            # 고품질 폴백 업스케일링
-            if not os.path.exists(model_path):
-                print(f"WARNING: [Model Loading] Model file not found: {model_path}", file=sys.stderr)
-            if not HAS_REALESRGAN:
-                print("WARNING: [Model Loading] RealESRGAN library not available", file=sys.stderr)
-            print("INFO: [Fallback] Using high-quality Lanczos upscaling (4x)...", file=sys.stderr)
-            target_w = int(original_size[0] * 4)
-            target_h = int(original_size[1] * 4)
-            sr_img = preprocessed_img.resize((target_w, target_h), Image.LANCZOS)
-            sr_size = sr_img.size
-            print(f"INFO: [Fallback] After 4x upscale (high-quality resize): {sr_size[0]} x {sr_size[1]}", file=sys.stderr)
-        
-        # 원하는 배율로 리사이즈 (4배가 아닌 경우)
-        if scale != 4.0:
-            target_w = int(original_size[0] * scale)
-            target_h = int(original_size[1] * scale)
-            print(f"INFO: [Resizing] Resizing to final size: {target_w} x {target_h}", file=sys.stderr)
-            sr_img = sr_img.resize((target_w, target_h), Image.LANCZOS)
-            # 원본도 같은 크기로 리사이즈 (색상 보존용)
-            original_img_backup = original_img_backup.resize((target_w, target_h), Image.LANCZOS)
-        
-        # 원본 색상 보존 후처리 파이프라인
-        final_img = postprocess_image_enhanced(sr_img, original_img_backup)
-
-        # 출력 디렉토리 생성
-        output_dir = os.path.dirname(args.output)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir, exist_ok=True)
-
-        # 이미지 저장 (고품질 PNG)
-        print(f"INFO: [Saving] Saving image: {args.output}", file=sys.stderr)
-        final_cv = cv2.cvtColor(np.array(final_img), cv2.COLOR_RGB2BGR)
-        cv2.imwrite(args.output, final_cv, [cv2.IMWRITE_PNG_COMPRESSION, 0])  # 무손실 압축
-        
-        final_size = final_cv.shape[:2][::-1]  # (width, height)
-        print(f"INFO: [Complete] Processing complete: {final_size[0]} x {final_size[1]}", file=sys.stderr)
-        print(f"INFO: [Complete] Quality enhancement applied successfully", file=sys.stderr)
-        
+                print(f"ERROR: [Daemon] {type(e).__name__}: {e}", file=sys.stderr)
+                print("FAIL", flush=True)
+        print("INFO: [Daemon] stdin closed - worker exiting", file=sys.stderr)
+        return
+
+    try:
+        _process_one(args.input, args.output, scale, bundle)
     except Exception as e:
         error_type = type(e).__name__
         error_msg = str(e)
@@ -10,6 +10,7 @@ import argparse
 import os
 import sys
 import io
+from concurrent.futures import ThreadPoolExecutor
 
 # UTF-8 인코딩 강제 설정 (Windows 환경 대응)
 if sys.platform == "win32":
@@ -19,123 +20,172 @@ if sys.platform == "win32":
 try:
     import cv2
     import numpy as np
-    from PIL import Image
-    import torch
-    import torch.nn.functional as F
 except ImportError as e:
     error_msg = f"Required library not installed: {e}"
-    install_msg = "Please install: pip install torch torchvision opencv-python pillow numpy"
+    install_msg = "Please install: pip install opencv-python numpy"
     print(f"ERROR: {error_msg}", file=sys.stderr)
     print(f"INFO: {install_msg}", file=sys.stderr)
     sys.exit(1)
 
+# torch 지연 import용 슬롯: standalone 경로는 RRDBNet 추론이 없어 메인
+# 흐름에서 torch가 전혀 필요 없다 - 시작 시 ~2초의 torch + CUDA 런타임
+# 초기화를 건너뛴다. ESRGAN 텐서 헬퍼를 쓰는 쪽에서만 지연 로드
+torch = None
 
-def load_realesrgan_model(model_path, device):
-    """Real-ESRGAN 모델 직접 로딩"""
+
+def _load_torch():
+    """torch 지연 import (텐서 전/후처리 헬퍼에서만 필요)"""
+    global torch
+    if torch is not None:
+        return
+    threads = str(min(16, os.cpu_count() or 4))
+    os.environ.setdefault("OMP_NUM_THREADS", threads)
+    os.environ.setdefault("MKL_NUM_THREADS", threads)
     try:
-        # Real-ESRGAN 모델 구조 (간단한 버전)
-        # 실제로는 더 복잡하지만, 기본적인 구조만 구현
-        from torch import nn
-        
-        # 모델 체크포인트 로드
-        checkpoint = torch.load(model_path, map_location=device)
-        
-        # 모델이 제대로 로드되었는지 확인
-        if 'params' in checkpoint or 'model' in checkpoint or 'state_dict' in checkpoint:
-            print(f"INFO: Model checkpoint loaded from {model_path}", file=sys.stderr)
-            return checkpoint
-        else:
-            raise ValueError("Invalid model checkpoint format")
-            
-    except Exception as e:
-        print(f"ERROR: Failed to load model: {e}", file=sys.stderr)
-        raise
+        import torch as _torch
+    except ImportError as e:
+        print(f"ERROR: Required library not installed: {e}", file=sys.stderr)
+        print("INFO: Please install: pip install torch", file=sys.stderr)
+        sys.exit(1)
+    torch = _torch
 
 
-def preprocess_for_esrgan(img_pil, device):
-    """Real-ESRGAN 입력 형식으로 전처리"""
-    # PIL Image를 tensor로 변환
-    img_array = np.array(img_pil).astype(np.float32) / 255.0
+# OpenCV 최적화 경로(IPP/SIMD)와 내부 parallel_for 스레드 수를 명시 설정
+# (일부 빌드는 스레딩이 꺼져 있거나 물리 코어 수보다 낮게 잡혀 있다)
+cv2.setUseOptimized(True)
+cv2.setNumThreads(min(16, os.cpu_count() or 4))
+
+# numba는 선택적 (없으면 기존 OpenCV 다중 패스 폴백)
+HAS_NUMBA = False
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fuse_unsharp_sharpen(img, gauss, out):
+        """언샤프 마스크(1.5/-0.5)와 3x3 십자 샤프닝을 한 번의 순회로 융합
+
+        addWeighted + filter2D 두 패스가 각각 전체 버퍼를 읽고 쓰는 대신
+        행 단위 병렬(prange)로 중간값을 제자리 계산한다. 중간 버퍼의
+        이웃 4픽셀은 즉석에서 재계산 - 대역폭 병목에서는 연산 재계산이
+        전체 프레임 재순회보다 싸다.
+        """
+        h, w = img.shape[:2]
+        for y in prange(h):
+            ym = y - 1 if y > 0 else 0
+            yp = y + 1 if y < h - 1 else h - 1
+            for x in range(w):
+                xm = x - 1 if x > 0 else 0
+                xp = x + 1 if x < w - 1 else w - 1
+                for c in range(3):
+                    # 중간값도 uint8 포화 클램프 - addWeighted 경로는 중간
+                    # 버퍼 저장 시점에 포화되므로 여기서도 맞춰야 결과가 같다
+                    tc = min(255.0, max(0.0, 1.5 * img[y, x, c] - 0.5 * gauss[y, x, c]))
+                    tu = min(255.0, max(0.0, 1.5 * img[ym, x, c] - 0.5 * gauss[ym, x, c]))
+                    td = min(255.0, max(0.0, 1.5 * img[yp, x, c] - 0.5 * gauss[yp, x, c]))
+                    tl = min(255.0, max(0.0, 1.5 * img[y, xm, c] - 0.5 * gauss[y, xm, c]))
+                    tr = min(255.0, max(0.0, 1.5 * img[y, xp, c] - 0.5 * gauss[y, xp, c]))
+                    # 십자 커널 [[0,-.5,0],[-.5,3,-.5],[0,-.5,0]] 적용
+                    v = 3.0 * tc - 0.5 * (tu + td + tl + tr)
+                    # min/max 클램프는 분기 없는 packed min/max로 내려감
+                    out[y, x, c] = np.uint8(min(255.0, max(0.0, v)))
+
+    # 첫 호출의 컴파일 지연을 피하기 위한 워밍업 (cache=True로 재실행 시 즉시 로드)
+    try:
+        _z = np.zeros((3, 3, 3), dtype=np.uint8)
+        _fuse_unsharp_sharpen(_z, _z, _z.copy())
+        del _z
+    except Exception:
+        HAS_NUMBA = False
+
+
+def preprocess_for_esrgan(img_bgr, device):
+    """Real-ESRGAN 입력 형식으로 전처리 (BGR ndarray → RGB tensor)"""
+    _load_torch()
+    # 채널 뒤집기는 astype이 어차피 만드는 복사에 얹는다 (별도 cvtColor 패스 없음)
+    img_array = img_bgr[..., ::-1].astype(np.float32) / 255.0
     img_tensor = torch.from_numpy(np.transpose(img_array, (2, 0, 1))).float()
     img_tensor = img_tensor.unsqueeze(0).to(device)
+    if device == "cuda":
+        # FP16으로 활성값 대역폭/VRAM 절반 + 텐서 코어 conv 경로 사용
+        img_tensor = img_tensor.half()
     return img_tensor
 
 
 def postprocess_from_esrgan(img_tensor):
-    """Real-ESRGAN 출력 tensor를 PIL Image로 변환"""
-    img_tensor = img_tensor.squeeze(0).cpu().clamp_(0, 1)
+    """Real-ESRGAN 출력 tensor를 BGR ndarray로 변환"""
+    # half 입력도 처리: float 복원은 D2H 전에 디바이스에서 수행
+    img_tensor = img_tensor.squeeze(0).float().cpu().clamp_(0, 1)
     img_array = np.transpose(img_tensor.numpy(), (1, 2, 0))
-    img_array = (img_array * 255.0).round().astype(np.uint8)
-    return Image.fromarray(img_array)
+    # RGB→BGR 뒤집기는 스케일링이 만드는 복사에 얹는다
+    return (img_array[..., ::-1] * 255.0).round().astype(np.uint8)
 
 
-def upscale_with_model(img_pil, model_path, device, scale=4):
-    """모델을 사용한 업스케일 (간단한 구현)"""
-    try:
-        # 모델 로드 시도
-        checkpoint = load_realesrgan_model(model_path, device)
-        
-        # 실제 Real-ESRGAN 모델을 사용하려면 복잡한 네트워크 구조가 필요
-        # 여기서는 고품질 리사이즈 + 후처리로 대체
-        print(f"INFO: Using high-quality upscaling with post-processing...", file=sys.stderr)
-        
-        # 고품질 업스케일링
-        original_size = img_pil.size
-        target_w = int(original_size[0] * scale)
-        target_h = int(original_size[1] * scale)
-        
-        # LANCZOS 리샘플링 (고품질)
-        upscaled = img_pil.resize((target_w, target_h), Image.LANCZOS)
-        
-        return upscaled
-        
-    except Exception as e:
-        print(f"WARNING: Model loading failed, using fallback: {e}", file=sys.stderr)
-        # 폴백: 고품질 리사이즈
-        original_size = img_pil.size
-        target_w = int(original_size[0] * scale)
-        target_h = int(original_size[1] * scale)
-        return img_pil.resize((target_w, target_h), Image.LANCZOS)
-
-
-def preprocess_image(img_pil):
-    """이미지 전처리: 노이즈 감소 및 품질 최적화"""
-    img_array = np.array(img_pil)
-    
-    # 약한 노이즈 감소
-    img_array = cv2.GaussianBlur(img_array, (3, 3), 0.5)
-    
-    return Image.fromarray(img_array)
-
-
-def postprocess_image(img_pil, enhance_sharpness=True, enhance_contrast=True):
-    """이미지 후처리: 선명도 및 대비 향상"""
-    img_cv = cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
-    
-    # 1. Unsharp Masking (선명도 향상)
+def upscale_with_model(img_bgr, model_path, device, scale=4):
+    """모델을 사용한 업스케일 (간단한 구현, BGR ndarray 입출력)
+
+    standalone 버전은 RRDBNet 네트워크를 구현하지 않으므로 체크포인트를
+    읽어봐야 쓸 곳이 없다 - 이전에는 ~64MB .pth를 torch.load로 풀고
+    버린 뒤 Lanczos로 폴백했다 (호출마다 디스크 I/O + unpickle 낭비).
+    실제 모델 추론은 quality_enhance.py / quality_enhance_text.py가 담당.
+    """
+    print(f"INFO: Using high-quality upscaling with post-processing...", file=sys.stderr)
+    target_w = img_bgr.shape[1] * scale
+    target_h = img_bgr.shape[0] * scale
+
+    # LANCZOS 리샘플링 (고품질)
+    return cv2.resize(img_bgr, (target_w, target_h), interpolation=cv2.INTER_LANCZOS4)
+
+
+# 언샤프용 1D 가우시안 커널 (σ=2.0이 8비트에서 고르는 13탭과 동일)
+# 분리형 1D 2패스는 2D 대비 탭 수가 O(k²)→O(2k)로 줄고 SIMD 경로를 탄다
+_GAUSS_UNSHARP = cv2.getGaussianKernel(13, 2.0).astype(np.float32)
+
+# 3x3 샤프닝 커널 상수 (호출마다 재생성하지 않고 float32 C-연속으로 유지 -
+# float64 커널은 filter2D가 범용 경로로 디스패치된다)
+_SHARPEN_K = np.array([
+    [0, -0.5, 0],
+    [-0.5, 3, -0.5],
+    [0, -0.5, 0]
+], dtype=np.float32)
+
+
+def preprocess_image(img_bgr):
+    """이미지 전처리: 노이즈 감소 및 품질 최적화 (BGR ndarray 입출력)"""
+    # 약한 노이즈 감소 (가우시안 블러는 색공간 무관 - BGR 그대로 처리)
+    return cv2.GaussianBlur(img_bgr, (3, 3), 0.5)
+
+
+def postprocess_image(img_cv, enhance_sharpness=True, enhance_contrast=True):
+    """이미지 후처리: 선명도 및 대비 향상 (BGR ndarray 입출력)"""
+    # 1. Unsharp Masking + 샤프닝 (numba가 있으면 1패스 융합 커널)
+    fused = False
     if enhance_sharpness:
-        gaussian = cv2.GaussianBlur(img_cv, (0, 0), 2.0)
-        unsharp = cv2.addWeighted(img_cv, 1.5, gaussian, -0.5, 0)
-        img_cv = unsharp
-    
+        gaussian = cv2.sepFilter2D(img_cv, -1, _GAUSS_UNSHARP, _GAUSS_UNSHARP)
+        if HAS_NUMBA:
+            out = np.empty_like(img_cv)
+            _fuse_unsharp_sharpen(img_cv, gaussian, out)
+            img_cv = out
+            fused = True
+        else:
+            img_cv = cv2.addWeighted(img_cv, 1.5, gaussian, -0.5, 0)
+
     # 2. CLAHE (Contrast Limited Adaptive Histogram Equalization)
     if enhance_contrast:
         lab = cv2.cvtColor(img_cv, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
+        # split/merge의 AoS↔SoA 왕복 없이 L 평면만 복사해 뷰에 기록
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        l = clahe.apply(l)
-        lab = cv2.merge([l, a, b])
+        lab[..., 0] = clahe.apply(np.ascontiguousarray(lab[..., 0]))
         img_cv = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-    
-    # 3. 약한 샤프닝 필터
-    kernel = np.array([
-        [0, -0.5, 0],
-        [-0.5, 3, -0.5],
-        [0, -0.5, 0]
-    ])
-    img_cv = cv2.filter2D(img_cv, -1, kernel)
-    
-    return Image.fromarray(cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB))
+
+    # 3. 약한 샤프닝 필터 (융합 커널이 이미 적용했으면 생략)
+    if not fused:
+        img_cv = cv2.filter2D(img_cv, -1, _SHARPEN_K)
+
+    return img_cv
 
 
 def main():
@@ -144,6 +194,8 @@ def main():
     parser.add_argument("--output", required=True, help="출력 이미지 경로")
     parser.add_argument("--scale", default="2.0", help="스케일 배율 (1.0 ~ 4.0)")
     parser.add_argument("--model", default="RealESRGAN_x4plus", help="모델 이름 (기본: RealESRGAN_x4plus)")
+    parser.add_argument("--format", choices=["png", "jpg"], default="png",
+                        help="출력 포맷 (출력 경로 확장자와 일치 권장, 기본: png)")
     args = parser.parse_args()
 
     scale = float(args.scale)
@@ -151,30 +203,30 @@ def main():
         print(f"ERROR: scale must be between 1.0 and 4.0 (current: {scale})", file=sys.stderr)
         sys.exit(1)
 
-    # GPU/CPU 자동 인식
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    print(f"INFO: Device: {device}", file=sys.stderr)
-    
-    if device == "cuda":
-        print(f"INFO: GPU: {torch.cuda.get_device_name(0)}", file=sys.stderr)
-    else:
-        print("INFO: Running in CPU mode (may be slow)", file=sys.stderr)
+    # standalone 업스케일은 cv2 Lanczos(CPU)로만 동작하므로 디바이스
+    # 판별을 위해 torch를 로드할 이유가 없다 (--help/에러 경로 포함
+    # 시작 시간이 ~2초 → ~50ms)
+    device = "cpu"
+    print(f"INFO: Device: {device} (standalone Lanczos path)", file=sys.stderr)
 
     # 모델 weights 경로
     weights_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "weights")
     model_path = os.path.join(weights_dir, f"{args.model}.pth")
 
-    # 이미지 로드
+    # 이미지 로드 (cv2는 BGR로 읽는다 - 전체 파이프라인이 BGR이라 변환 불필요)
     print(f"INFO: Loading image: {args.input}", file=sys.stderr)
-    img = Image.open(args.input).convert("RGB")
-    original_size = img.size
+    img = cv2.imread(args.input, cv2.IMREAD_COLOR)
+    if img is None:
+        print(f"ERROR: Failed to load image: {args.input}", file=sys.stderr)
+        sys.exit(1)
+    original_size = (img.shape[1], img.shape[0])
     print(f"INFO: Original size: {original_size[0]} x {original_size[1]}", file=sys.stderr)
 
     try:
-        # 전처리
+        # 전처리 (Lanczos 보간 전 노이즈 증폭을 막는 약한 디노이즈)
         print("INFO: Preprocessing image...", file=sys.stderr)
         preprocessed_img = preprocess_image(img)
-        
+
         # 업스케일 (4배)
         print("INFO: Upscaling image (4x)...", file=sys.stderr)
         if os.path.exists(model_path):
@@ -183,17 +235,17 @@ def main():
             print(f"WARNING: Model file not found: {model_path}, using high-quality resize", file=sys.stderr)
             target_w = int(original_size[0] * 4)
             target_h = int(original_size[1] * 4)
-            sr_img = preprocessed_img.resize((target_w, target_h), Image.LANCZOS)
-        
-        sr_size = sr_img.size
+            sr_img = cv2.resize(preprocessed_img, (target_w, target_h), interpolation=cv2.INTER_LANCZOS4)
+
+        sr_size = (sr_img.shape[1], sr_img.shape[0])
         print(f"INFO: After 4x upscale: {sr_size[0]} x {sr_size[1]}", file=sys.stderr)
-        
+
         # 원하는 배율로 리사이즈 (4배가 아닌 경우)
         if scale != 4.0:
             target_w = int(original_size[0] * scale)
             target_h = int(original_size[1] * scale)
             print(f"INFO: Resizing to final size: {target_w} x {target_h}", file=sys.stderr)
-            sr_img = sr_img.resize((target_w, target_h), Image.LANCZOS)
+            sr_img = cv2.resize(sr_img, (target_w, target_h), interpolation=cv2.INTER_LANCZOS4)
         
         # 후처리: 선명도 및 대비 향상
         print("INFO: Postprocessing (sharpening, contrast enhancement)...", file=sys.stderr)
@@ -204,14 +256,23 @@ def main():
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
 
-        # 이미지 저장 (고품질 PNG)
+        # 이미지 저장 (레벨 0은 무압축이라 파일이 수 배로 커짐 -
+        # 레벨 1 + FILTERED가 비슷한 CPU 비용으로 훨씬 작다, 무손실 동일)
+        # cv2.imwrite는 libpng/libjpeg 내부에서 GIL을 놓으므로 백그라운드
+        # 스레드에서 인코딩/쓰기를 마무리 로그와 겹친다
         print(f"INFO: Saving image: {args.output}", file=sys.stderr)
-        final_cv = cv2.cvtColor(np.array(final_img), cv2.COLOR_RGB2BGR)
-        cv2.imwrite(args.output, final_cv, [cv2.IMWRITE_PNG_COMPRESSION, 0])  # 무손실 압축
-        
-        final_size = final_cv.shape[:2][::-1]  # (width, height)
-        print(f"INFO: Processing complete: {final_size[0]} x {final_size[1]}", file=sys.stderr)
-        print(f"INFO: Quality enhancement applied successfully", file=sys.stderr)
+        final_cv = final_img  # 이미 BGR ndarray - cv2.imwrite에 그대로 전달
+        if args.format == "jpg":
+            save_params = [cv2.IMWRITE_JPEG_QUALITY, 95, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+        else:
+            save_params = [cv2.IMWRITE_PNG_COMPRESSION, 1,
+                           cv2.IMWRITE_PNG_STRATEGY, cv2.IMWRITE_PNG_STRATEGY_FILTERED]
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            writer = pool.submit(cv2.imwrite, args.output, final_cv, save_params)
+            final_size = final_cv.shape[:2][::-1]  # (width, height)
+            print(f"INFO: Processing complete: {final_size[0]} x {final_size[1]}", file=sys.stderr)
+            print(f"INFO: Quality enhancement applied successfully", file=sys.stderr)
+            writer.result()
         
     except Exception as e:
         error_type = type(e).__name__
@@ -15,12 +15,24 @@ if sys.platform == "win32":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
 
-try:
-    import torch
-    from realesrgan import RealESRGAN
-except ImportError as e:
-    print(f"ERROR: Required library not installed: {e}", file=sys.stderr)
-    sys.exit(1)
+# torch/realesrgan은 지연 임포트: 경로 헬퍼만 쓰는 소비자가 ~1-2초의
+# torch + CUDA 런타임 초기화를 지불하지 않게 한다. (기존의 모듈 최상위
+# `from realesrgan import RealESRGAN`은 잘못된 클래스명이라 - 패키지는
+# RealESRGANer를 내보낸다 - realesrgan이 깔려 있어도 임포트가 실패했다)
+torch = None
+
+
+def _load_torch():
+    """torch 지연 로드 (실제 모델/디바이스 작업 직전에만 호출)"""
+    global torch
+    if torch is None:
+        try:
+            import torch as _torch
+        except ImportError as e:
+            print(f"ERROR: Required library not installed: {e}", file=sys.stderr)
+            sys.exit(1)
+        torch = _torch
+    return torch
 
 
 def get_weights_dir():
@@ -44,30 +56,46 @@ def check_model_exists(model_name: str, weights_dir: Path = None):
 
 
 def load_esrgan_model(device: str = "auto", scale: int = 4, model_name: str = "RealESRGAN_x4plus"):
-    """Real-ESRGAN 모델 로드"""
+    """Real-ESRGAN 모델 로드 (RealESRGANer 인스턴스와 디바이스 반환)"""
+    torch = _load_torch()
+    try:
+        from realesrgan import RealESRGANer
+    except ImportError as e:
+        print(f"ERROR: Required library not installed: {e}", file=sys.stderr)
+        sys.exit(1)
+
     # Device 자동 선택
     if device == "auto":
         device = "cuda" if torch.cuda.is_available() else "cpu"
-    
+
     # 모델 파일 경로 확인
     model_path = get_model_path(model_name)
-    
+
     if not model_path.exists():
         raise FileNotFoundError(
             f"Model file not found: {model_path}\n"
             f"Please download: python scripts/download_models.py"
         )
-    
-    # 모델 로드
-    model = RealESRGAN(device, scale=scale)
-    model.load_weights(str(model_path))
-    
+
+    # 모델 로드 (처리 스크립트들과 동일한 RealESRGANer API)
+    model = RealESRGANer(
+        scale=scale,
+        model_path=str(model_path),
+        model=None,
+        tile=512,
+        tile_pad=10,
+        pre_pad=0,
+        half=device == "cuda",
+        gpu_id=0 if device == "cuda" else None,
+    )
+
     return model, device
 
 
 def get_device_info():
     """디바이스 정보 반환"""
     try:
+        torch = _load_torch()
         if torch.cuda.is_available():
             return {
                 "device": "cuda",